@@ -1,14 +1,39 @@
+import logging
+
 from flask import Flask
 import config
 from routes.auth_routes import auth_bp
 from routes.user_routes import user_bp
+from routes.admin_routes import admin_bp
+from routes.pet_routes import pet_bp
+from routes.appointment_routes import appointment_bp
+from routes.catalog_routes import catalog_bp
+from routes.image_routes import image_bp
+from services.catalog_service import CatalogService
+from utils.json_provider import APIJSONProvider
+from utils.metrics import instrument_app
 
 def create_app():
+    logging.basicConfig(level=config.LOG_LEVEL)
+
     app = Flask(__name__)
+    app.json = APIJSONProvider(app)
     app.config['SECRET_KEY'] = config.SECRET_KEY
 
+    if config.METRICS_ENABLED:
+        instrument_app(app)
+
     app.register_blueprint(auth_bp)
     app.register_blueprint(user_bp)
+    app.register_blueprint(admin_bp)
+    app.register_blueprint(pet_bp)
+    app.register_blueprint(appointment_bp)
+    app.register_blueprint(catalog_bp)
+    app.register_blueprint(image_bp)
+
+    # Started from the first request rather than here so that it runs in
+    # the worker process, not in a master that forks afterwards.
+    app.before_request(CatalogService.start_listener)
 
     @app.route("/")
     def home():
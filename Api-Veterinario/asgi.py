@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import psycopg2
+from quart import Quart
+import config
+from db.async_database import AsyncDatabase
+from routes.async_auth_routes import async_auth_bp
+from routes.async_user_routes import async_user_bp
+from services.catalog_service import CatalogService
+
+logger = logging.getLogger(__name__)
+
+def create_app():
+    app = Quart(__name__)
+    app.config['SECRET_KEY'] = config.SECRET_KEY
+
+    app.register_blueprint(async_auth_bp)
+    app.register_blueprint(async_user_bp)
+
+    @app.before_serving
+    async def open_pool():
+        await AsyncDatabase.get_pool()
+        # The catalog is read with psycopg2, so it is loaded off the event
+        # loop; request handlers only read the in-memory copy.
+        try:
+            await asyncio.to_thread(CatalogService.load)
+        except psycopg2.Error as e:
+            logger.error("No se pudo cargar el catálogo: %s", e)
+        CatalogService.start_listener()
+
+    @app.after_serving
+    async def close_pool():
+        await AsyncDatabase.close_pool()
+
+    @app.route("/")
+    async def home():
+        return "¡API de la Veterinaria en funcionamiento!"
+    return app
+
+app = create_app()
+
+if __name__ == '__main__':
+    app.run(
+        host=config.HOST,
+        port=config.PORT,
+        debug=config.DEBUG
+    )
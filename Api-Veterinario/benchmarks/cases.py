@@ -0,0 +1,97 @@
+from functools import partial
+
+import config
+from db.database import Session
+from utils.response import APIResponse
+from utils.security import Security
+from benchmarks.fake_db import FakeConnection, make_rows
+
+HASH_METHODS = ("pbkdf2:sha256:600000", "scrypt:16384:8:1", "scrypt:32768:8:1")
+ROW_COUNTS = (100, 10000)
+ROW_FORMATS = ("dict", "tuple", "slots")
+
+PG_QUERY = (
+    "SELECT g AS idUsuario, 'usuario_' || g AS nombre, 'scrypt:32768:8:1$salt$hash' AS contraseña, "
+    "(ARRAY['cliente', 'empleado', 'programador'])[g % 3 + 1] AS rol, "
+    "TIMESTAMP '2024-01-01 12:00:00' AS creado "
+    "FROM generate_series(1, %s) g"
+)
+
+
+def _with_config(name, value, function):
+    def run():
+        previous = getattr(config, name)
+        setattr(config, name, value)
+        try:
+            return function()
+        finally:
+            setattr(config, name, previous)
+    return run
+
+
+def hashing_cases(quick):
+    repeat = 3 if quick else 5
+    for method in HASH_METHODS:
+        hash_password = _with_config("PASSWORD_HASH_METHOD", method, partial(Security.hash_password, "contraseña-segura"))
+        hashed = hash_password()
+        yield f"security.hash_password[{method}]", hash_password, 1, repeat
+        yield (f"security.check_password[{method}]",
+               partial(Security.check_password, hashed, "contraseña-segura"),
+               1, repeat)
+
+
+def token_cases(quick):
+    token = Security.generate_token({'idusuario': 1, 'nombre': "usuario_1", 'rol': "cliente"})
+    number = 200 if quick else 2000
+    yield ("security.generate_token",
+           partial(Security.generate_token, {'idusuario': 1, 'nombre': "usuario_1", 'rol': "cliente"}),
+           number, 5)
+    yield ("security.decode_token[cache]",
+           _with_config("TOKEN_CACHE_ENABLED", True, partial(Security.decode_token, f"Bearer {token}")),
+           number, 5)
+    yield ("security.decode_token[sin_cache]",
+           _with_config("TOKEN_CACHE_ENABLED", False, partial(Security.decode_token, f"Bearer {token}")),
+           number, 5)
+
+
+def response_cases(app, quick):
+    for count in ROW_COUNTS:
+        for row_format in ("dict", "slots"):
+            connection = FakeConnection(make_rows(count))
+            rows = Session(connection).execute_query("SELECT", row_format=row_format)
+
+            def run(rows=rows):
+                with app.test_request_context():
+                    response, _ = APIResponse.success(rows)
+                    return response.get_data()
+
+            number = max(1, 20000 // count) if not quick else max(1, 2000 // count)
+            yield f"api_response.success[{row_format},{count}]", run, number, 5
+
+
+def _rolled_back(session, function):
+    # Session leaves the transaction to its caller; ending it after every
+    # run keeps the benchmark connection from idling in transaction.
+    def run():
+        try:
+            return function()
+        finally:
+            session.connection.rollback()
+    return run
+
+
+def execute_query_cases(quick, backend, connection):
+    for count in ROW_COUNTS:
+        for row_format in ROW_FORMATS:
+            session = Session(connection(count) if backend == "fake" else connection)
+            query = "SELECT" if backend == "fake" else PG_QUERY
+            params = None if backend == "fake" else (count,)
+            number = max(1, 50000 // count) if not quick else max(1, 5000 // count)
+            run = partial(session.execute_query, query, params, row_format=row_format)
+            if backend == "postgres":
+                run = _rolled_back(session, run)
+            yield f"database.execute_query[{backend},{row_format},{count}]", run, number, 5
+
+
+def fake_connection(count):
+    return FakeConnection(make_rows(count))
@@ -0,0 +1,47 @@
+import datetime
+
+
+def make_rows(count):
+    created = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        (index, f"usuario_{index}", "scrypt:32768:8:1$salt$hash", ("cliente", "empleado", "programador")[index % 3], created)
+        for index in range(1, count + 1)
+    ]
+
+
+COLUMNS = ("idUsuario", "nombre", "contraseña", "rol", "creado")
+
+
+class FakeCursor:
+
+    def __init__(self, rows):
+        self._rows = rows
+        self.description = None
+
+    def execute(self, query, params=None):
+        self.description = tuple((name, None, None, None, None, None, None) for name in COLUMNS)
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    closed = 0
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self.rows)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
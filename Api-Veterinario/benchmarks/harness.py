@@ -0,0 +1,46 @@
+import statistics
+import time
+
+
+def measure(function, number=1, repeat=5, warmup=1):
+    for _ in range(warmup):
+        function()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - started) / number)
+
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': samples[0],
+        'median': median,
+        'mean': statistics.fmean(samples),
+        'max': samples[-1],
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops_per_second': 1 / median if median else None,
+    }
+
+
+def compare(results, baseline, threshold):
+    # Medians are compared because they are the least sensitive to the odd
+    # scheduler hiccup; only cases present in both runs are checked.
+    comparisons = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ratio = current['median'] / previous['median'] if previous['median'] else 1.0
+        comparisons.append({
+            'case': name,
+            'baseline': previous['median'],
+            'current': current['median'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return comparisons
@@ -0,0 +1,98 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+
+import psycopg2
+
+import config
+
+# Instrumentation would otherwise be measured along with the code under test.
+config.METRICS_ENABLED = False
+config.SLOW_QUERY_THRESHOLD_MS = 0
+config.HASH_EXECUTOR_ENABLED = False
+
+from app import create_app
+from benchmarks import cases
+from benchmarks.harness import compare, measure
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmarks de hashing, tokens, serialización de respuestas y consultas."
+    )
+    parser.add_argument("--salida", default="benchmarks/resultados.json", help="Archivo JSON de resultados")
+    parser.add_argument("--base", help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument("--umbral", type=float, default=0.2,
+                        help="Empeoramiento relativo de la mediana que se considera regresión (0.2 = 20%%)")
+    parser.add_argument("--filtro", default="*", help="Patrón de nombres de caso, p. ej. 'security.*'")
+    parser.add_argument("--rapido", action="store_true", help="Menos iteraciones, para CI")
+    parser.add_argument("--dsn", default=os.environ.get("BENCH_DSN"),
+                        help="DSN de un PostgreSQL local (por defecto BENCH_DSN); sin él se omite ese backend")
+    return parser.parse_args(argv)
+
+
+def collect_cases(args):
+    app = create_app()
+    yield from cases.hashing_cases(args.rapido)
+    yield from cases.token_cases(args.rapido)
+    yield from cases.response_cases(app, args.rapido)
+    yield from cases.execute_query_cases(args.rapido, "fake", cases.fake_connection)
+
+    if not args.dsn:
+        print("BENCH_DSN no definido: se omiten los casos contra PostgreSQL", file=sys.stderr)
+        return
+    try:
+        connection = psycopg2.connect(args.dsn)
+    except psycopg2.Error as e:
+        print(f"No se pudo conectar a PostgreSQL, se omiten sus casos: {e}", file=sys.stderr)
+        return
+    try:
+        yield from cases.execute_query_cases(args.rapido, "postgres", connection)
+    finally:
+        connection.close()
+
+
+def cases_matching(args):
+    for case in collect_cases(args):
+        if fnmatch.fnmatch(case[0], args.filtro):
+            yield case
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = {}
+    for name, function, number, repeat in cases_matching(args):
+        results[name] = measure(function, number=number, repeat=repeat)
+        print(f"{name:<60} {results[name]['median'] * 1e6:>14.1f} µs/op", file=sys.stderr)
+
+    report = {
+        'fecha': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'rapido': args.rapido,
+        'resultados': results,
+    }
+
+    status = 0
+    if args.base:
+        with open(args.base, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)['resultados']
+        report['comparacion'] = compare(results, baseline, args.umbral)
+        for item in report['comparacion']:
+            if item['regression']:
+                status = 1
+                print(f"REGRESIÓN {item['case']}: {item['ratio']:.2f}x respecto a la base", file=sys.stderr)
+
+    with open(args.salida, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}", file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,4 +12,95 @@ DB_CONFIG = {
     'user': os.environ.get('DB_USER', 'postgres'),
     'password': os.environ.get('DB_PASSWORD', 'postgres'),
     'options': os.environ.get('DB_OPTIONS', '-c search_path=public')
-}
\ No newline at end of file
+}
+
+DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', 'True').lower() == 'true'
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', 1))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', 10))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))
+DB_POOL_MAX_USES = int(os.environ.get('DB_POOL_MAX_USES', 1000))
+DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800))
+DB_POOL_CHECK_IDLE = float(os.environ.get('DB_POOL_CHECK_IDLE', 30))
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', 300))
+DB_STREAM_CHUNK_SIZE = int(os.environ.get('DB_STREAM_CHUNK_SIZE', 1000))
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+SLOW_QUERY_LOG_SIZE = int(os.environ.get('SLOW_QUERY_LOG_SIZE', 50))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'True').lower() == 'true'
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.environ.get('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000))
+
+USERS_PAGE_SIZE = int(os.environ.get('USERS_PAGE_SIZE', 100))
+USERS_PAGE_MAX = int(os.environ.get('USERS_PAGE_MAX', 1000))
+
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 256))
+DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', 'True').lower() == 'true'
+DB_PREPARED_PER_CONNECTION = int(os.environ.get('DB_PREPARED_PER_CONNECTION', 64))
+
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+HASH_EXECUTOR_ENABLED = os.environ.get('HASH_EXECUTOR_ENABLED', 'False').lower() == 'true'
+HASH_EXECUTOR_WORKERS = int(os.environ.get('HASH_EXECUTOR_WORKERS', os.cpu_count() or 1))
+HASH_EXECUTOR_MAX_PENDING = int(os.environ.get('HASH_EXECUTOR_MAX_PENDING', (os.cpu_count() or 1) * 4))
+HASH_EXECUTOR_TIMEOUT = float(os.environ.get('HASH_EXECUTOR_TIMEOUT', 10))
+
+TOKEN_CACHE_ENABLED = os.environ.get('TOKEN_CACHE_ENABLED', 'True').lower() == 'true'
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+USER_CACHE_BACKEND = os.environ.get('USER_CACHE_BACKEND', 'memory')
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+USER_CACHE_TTL = float(os.environ.get('USER_CACHE_TTL', 60))
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+DB_ROW_FORMAT = os.environ.get('DB_ROW_FORMAT', 'dict')
+
+BATCH_REGISTER_MAX = int(os.environ.get('BATCH_REGISTER_MAX', 5000))
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+# Bearer token for scrapers of /metrics; without it only programador sessions may read it.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'auto')
+JSON_STREAM_MIN_ITEMS = int(os.environ.get('JSON_STREAM_MIN_ITEMS', 1000))
+JSON_STREAM_CHUNK_SIZE = int(os.environ.get('JSON_STREAM_CHUNK_SIZE', 500))
+CONDITIONAL_GET_ENABLED = os.environ.get('CONDITIONAL_GET_ENABLED', 'True').lower() == 'true'
+
+PETS_PAGE_SIZE = int(os.environ.get('PETS_PAGE_SIZE', 50))
+PETS_PAGE_MAX = int(os.environ.get('PETS_PAGE_MAX', 200))
+PETS_BATCH_MAX_OWNERS = int(os.environ.get('PETS_BATCH_MAX_OWNERS', 500))
+
+CLINIC_OPENING_TIME = os.environ.get('CLINIC_OPENING_TIME', '09:00')
+CLINIC_CLOSING_TIME = os.environ.get('CLINIC_CLOSING_TIME', '20:00')
+APPOINTMENT_SLOT_STEP = int(os.environ.get('APPOINTMENT_SLOT_STEP', 15))
+APPOINTMENT_SEARCH_DAYS = int(os.environ.get('APPOINTMENT_SEARCH_DAYS', 30))
+APPOINTMENT_MAX_SLOTS = int(os.environ.get('APPOINTMENT_MAX_SLOTS', 50))
+SCHEDULE_VERSION_CHECK_INTERVAL = float(os.environ.get('SCHEDULE_VERSION_CHECK_INTERVAL', 1))
+SCHEDULE_CACHE_MAX_DAYS = int(os.environ.get('SCHEDULE_CACHE_MAX_DAYS', 20000))
+CALENDAR_MAX_DAYS = int(os.environ.get('CALENDAR_MAX_DAYS', 62))
+
+CATALOG_LISTEN_ENABLED = os.environ.get('CATALOG_LISTEN_ENABLED', 'True').lower() == 'true'
+CATALOG_CHECK_INTERVAL = float(os.environ.get('CATALOG_CHECK_INTERVAL', 30))
+CATALOG_RETRY_INTERVAL = float(os.environ.get('CATALOG_RETRY_INTERVAL', 5))
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 300))
+
+SEARCH_MIN_LENGTH = int(os.environ.get('SEARCH_MIN_LENGTH', 3))
+SEARCH_MAX_LENGTH = int(os.environ.get('SEARCH_MAX_LENGTH', 100))
+SEARCH_LIMIT = int(os.environ.get('SEARCH_LIMIT', 20))
+SEARCH_LIMIT_MAX = int(os.environ.get('SEARCH_LIMIT_MAX', 100))
+AUTOCOMPLETE_MIN_LENGTH = int(os.environ.get('AUTOCOMPLETE_MIN_LENGTH', 2))
+AUTOCOMPLETE_LIMIT = int(os.environ.get('AUTOCOMPLETE_LIMIT', 10))
+AUTOCOMPLETE_LIMIT_MAX = int(os.environ.get('AUTOCOMPLETE_LIMIT_MAX', 25))
+AUTOCOMPLETE_CACHE_SIZE = int(os.environ.get('AUTOCOMPLETE_CACHE_SIZE', 4096))
+AUTOCOMPLETE_CACHE_TTL = float(os.environ.get('AUTOCOMPLETE_CACHE_TTL', 10))
+
+HISTORY_PAGE_SIZE = int(os.environ.get('HISTORY_PAGE_SIZE', 20))
+HISTORY_PAGE_MAX = int(os.environ.get('HISTORY_PAGE_MAX', 100))
+HISTORY_ENTRY_MAX_LENGTH = int(os.environ.get('HISTORY_ENTRY_MAX_LENGTH', 20000))
+
+IMAGE_STORAGE_DIR = os.environ.get('IMAGE_STORAGE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'imagenes'))
+IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', 10 * 1024 * 1024))
+IMAGE_THUMBNAIL_SIZES = tuple(int(size) for size in os.environ.get('IMAGE_THUMBNAIL_SIZES', '128,512').split(','))
+IMAGE_THUMBNAIL_QUALITY = int(os.environ.get('IMAGE_THUMBNAIL_QUALITY', 85))
+IMAGE_THUMBNAIL_WORKERS = int(os.environ.get('IMAGE_THUMBNAIL_WORKERS', 2))
+IMAGE_CACHE_MAX_AGE = int(os.environ.get('IMAGE_CACHE_MAX_AGE', 365 * 24 * 3600))
+IMAGE_SWEEP_GRACE = int(os.environ.get('IMAGE_SWEEP_GRACE', 24 * 3600))
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import shlex
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+import config
+from db.database import Database
+from db.statements import Statement, to_numbered_placeholders
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=512)
+def _numbered(sql):
+    return to_numbered_placeholders(sql)[0]
+
+
+def _connect_kwargs():
+    server_settings = {}
+    options = shlex.split(config.DB_CONFIG.get('options') or '')
+    for index, option in enumerate(options):
+        if option == '-c' and index + 1 < len(options):
+            key, _, value = options[index + 1].partition('=')
+            server_settings[key] = value
+
+    return {
+        'host': config.DB_CONFIG['host'],
+        'port': int(config.DB_CONFIG['port']),
+        'database': config.DB_CONFIG['dbname'],
+        'user': config.DB_CONFIG['user'],
+        'password': config.DB_CONFIG['password'],
+        'server_settings': server_settings,
+    }
+
+
+def _to_dicts(records):
+    return [{key.lower(): value for key, value in record.items()} for record in records]
+
+
+class AsyncSession:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def execute_query(self, query, params=None, fetch=True):
+        sql = _numbered(query.sql if isinstance(query, Statement) else query)
+        args = tuple(params) if params else ()
+
+        if not fetch:
+            await self.connection.execute(sql, *args)
+            return True
+
+        return _to_dicts(await self.connection.fetch(sql, *args))
+
+    async def insert(self, table, data, returning=None, on_conflict=None):
+        query, values = Database._build_insert(table, data, returning, on_conflict)
+        return await self.execute_query(query, values)
+
+    async def insert_select(self, table, data, source, condition, condition_params, returning=None, on_conflict=None):
+        query, values = Database._build_insert_select(
+            table, data, source, condition, condition_params, returning, on_conflict
+        )
+        return await self.execute_query(query, values)
+
+    async def update(self, table, data, condition, condition_params, returning=None):
+        query, values = Database._build_update(table, data, condition, condition_params, returning)
+        return await self.execute_query(query, values, fetch=bool(returning))
+
+    async def select(self, table, columns="*", condition=None, condition_params=None, order_by=None, for_update=False, limit=None):
+        query, params = Database._build_select(table, columns, condition, condition_params, order_by, for_update, limit)
+        return await self.execute_query(query, params)
+
+    async def stream(self, query, params=None, chunk_size=1000):
+        sql = _numbered(query.sql if isinstance(query, Statement) else query)
+        args = tuple(params) if params else ()
+        async for record in self.connection.cursor(sql, *args, prefetch=chunk_size):
+            yield {key.lower(): value for key, value in record.items()}
+
+
+class AsyncDatabase:
+    _pools = {}
+    _pool_locks = {}
+
+    @staticmethod
+    async def get_pool():
+        if asyncpg is None:
+            raise RuntimeError("El modo asíncrono requiere el paquete asyncpg")
+
+        # asyncpg pools are bound to the event loop that created them.
+        loop = asyncio.get_running_loop()
+        pool = AsyncDatabase._pools.get(loop)
+        if pool is None:
+            # Like the pool, the lock must belong to the running loop.
+            lock = AsyncDatabase._pool_locks.setdefault(loop, asyncio.Lock())
+            async with lock:
+                pool = AsyncDatabase._pools.get(loop)
+                if pool is None:
+                    # asyncpg has no absolute connection lifetime: connections
+                    # are recycled after max_queries, and idle ones are closed
+                    # after DB_POOL_MAX_IDLE seconds.
+                    pool = await asyncpg.create_pool(
+                        min_size=config.DB_POOL_MIN_SIZE,
+                        max_size=config.DB_POOL_MAX_SIZE,
+                        max_queries=config.DB_POOL_MAX_USES,
+                        max_inactive_connection_lifetime=config.DB_POOL_MAX_IDLE,
+                        statement_cache_size=config.DB_STATEMENT_CACHE_SIZE if config.DB_PREPARED_STATEMENTS else 0,
+                        **_connect_kwargs()
+                    )
+                    AsyncDatabase._pools[loop] = pool
+        return pool
+
+    @staticmethod
+    async def close_pool():
+        loop = asyncio.get_running_loop()
+        AsyncDatabase._pool_locks.pop(loop, None)
+        pool = AsyncDatabase._pools.pop(loop, None)
+        if pool is not None:
+            await pool.close()
+
+    @staticmethod
+    async def pool_stats():
+        pool = await AsyncDatabase.get_pool()
+        return {
+            'enabled': True,
+            'min_size': pool.get_min_size(),
+            'max_size': pool.get_max_size(),
+            'size': pool.get_size(),
+            'idle': pool.get_idle_size(),
+            'in_use': pool.get_size() - pool.get_idle_size(),
+        }
+
+    @staticmethod
+    @asynccontextmanager
+    async def transaction():
+        pool = await AsyncDatabase.get_pool()
+        async with pool.acquire(timeout=config.DB_POOL_TIMEOUT) as connection:
+            try:
+                async with connection.transaction():
+                    yield AsyncSession(connection)
+            except asyncpg.PostgresError as e:
+                logger.error("Database error: %s", e)
+                raise
+
+    @staticmethod
+    async def execute_query(query, params=None, fetch=True):
+        async with AsyncDatabase.transaction() as session:
+            return await session.execute_query(query, params, fetch)
+
+    @staticmethod
+    async def insert(table, data, returning=None, on_conflict=None):
+        async with AsyncDatabase.transaction() as session:
+            return await session.insert(table, data, returning, on_conflict)
+
+    @staticmethod
+    async def update(table, data, condition, condition_params, returning=None):
+        async with AsyncDatabase.transaction() as session:
+            return await session.update(table, data, condition, condition_params, returning)
+
+    @staticmethod
+    async def select(table, columns="*", condition=None, condition_params=None, order_by=None, for_update=False, limit=None):
+        async with AsyncDatabase.transaction() as session:
+            return await session.select(table, columns, condition, condition_params, order_by, for_update, limit)
+
+    @staticmethod
+    async def select_stream(table, columns="*", condition=None, condition_params=None, order_by=None, chunk_size=None):
+        query, params = Database._build_select(table, columns, condition, condition_params, order_by)
+        async with AsyncDatabase.transaction() as session:
+            async for row in session.stream(query, params, chunk_size or config.DB_STREAM_CHUNK_SIZE):
+                yield row
@@ -1,79 +1,494 @@
+import atexit
+import logging
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
 import psycopg2
+import psycopg2.extras
 import config
+from db.pool import ConnectionPool, PooledConnection
+from db.rows import row_factory
+from db.slow_queries import SlowQueryLog
+from db.statements import Statement, StatementCache
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# EXPLAIN ANALYZE really runs the statement. The rollback undoes writes, but
+# not what these leave behind (sequence values, advisory locks), and row
+# locks would still block other sessions while the plan is captured.
+_NOT_ANALYZABLE = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|NEXTVAL|SETVAL|PG_ADVISORY_\w+)\b|\bFOR\s+(NO\s+KEY\s+|KEY\s+)?(UPDATE|SHARE)\b",
+    re.IGNORECASE
+)
+
+
+def _analyzable(sql):
+    return sql.split(None, 1)[0].lower() in ("select", "with") and not _NOT_ANALYZABLE.search(sql)
+
+
+def _query_shape(query):
+    if isinstance(query, Statement):
+        return query.sql
+    return " ".join(query.split())
+
+
+def _observe(query, params, started, rows, explain=True):
+    elapsed = time.perf_counter() - started
+    shape = None
+    if config.METRICS_ENABLED:
+        shape = _query_shape(query)
+        metrics.db_query_duration.observe(elapsed, shape)
+        if rows:
+            metrics.db_query_rows.inc(shape, amount=rows)
+    if config.SLOW_QUERY_THRESHOLD_MS and elapsed * 1000 >= config.SLOW_QUERY_THRESHOLD_MS:
+        Database._slow_queries.record(
+            shape or _query_shape(query),
+            query.sql if isinstance(query, Statement) else query,
+            params, elapsed, rows, capture_plan=explain and config.SLOW_QUERY_EXPLAIN
+        )
+
+
+class Session:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _execute(self, cursor, query, params):
+        if isinstance(query, Statement):
+            if (query.name and config.DB_PREPARED_STATEMENTS
+                    and isinstance(self.connection, PooledConnection)):
+                self._execute_prepared(cursor, query, params)
+                return
+            query = query.sql
+
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+    def _execute_prepared(self, cursor, statement, params):
+        prepared = self.connection.prepared
+        if statement.name in prepared:
+            prepared.move_to_end(statement.name)
+            Database._statements.record_prepare(hit=True)
+        else:
+            cursor.execute(statement.prepare_sql)
+            prepared[statement.name] = True
+            deallocated = 0
+            while len(prepared) > config.DB_PREPARED_PER_CONNECTION:
+                name, _ = prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {name}")
+                deallocated += 1
+            Database._statements.record_prepare(hit=False, deallocated=deallocated)
+
+        cursor.execute(statement.execute_sql, params or None)
+
+    def execute_query(self, query, params=None, fetch=True, row_format=None):
+        started = time.perf_counter()
+        rows = 0
+        cursor = self.connection.cursor()
+        try:
+            self._execute(cursor, query, params)
+
+            if not fetch:
+                return True
+
+            result = None
+            if cursor.description:
+                columns = tuple(desc[0].lower() for desc in cursor.description)
+                make_row = row_factory(row_format or config.DB_ROW_FORMAT, columns)
+                result = [make_row(row) for row in cursor.fetchall()]
+                rows = len(result)
+                if result and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Resultado de la consulta (%d filas): %s", len(result), result)
+            return result
+        finally:
+            cursor.close()
+            _observe(query, params, started, rows)
+
+    def insert(self, table, data, returning=None, on_conflict=None):
+        query, values = Database._build_insert(table, data, returning, on_conflict)
+        return self.execute_query(query, values)
+
+    def insert_many(self, table, rows, returning=None, on_conflict=None, page_size=1000):
+        if not rows:
+            return []
+        columns = tuple(rows[0].keys())
+        query = Database._build_insert_many(table, columns, returning, on_conflict)
+        values = [tuple(row[column] for column in columns) for row in rows]
+
+        started = time.perf_counter()
+        cursor = self.connection.cursor()
+        try:
+            result = psycopg2.extras.execute_values(
+                cursor, query.sql, values, page_size=page_size, fetch=bool(returning)
+            )
+            if not returning:
+                return True
+            names = tuple(desc[0].lower() for desc in cursor.description)
+            make_row = row_factory('dict', names)
+            return [make_row(row) for row in result]
+        finally:
+            cursor.close()
+            # execute_values expands VALUES %s client side; EXPLAIN on the
+            # bare template would always fail.
+            _observe(query, None, started, len(values), explain=False)
+
+    def copy_from(self, table, columns, source):
+        cursor = self.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                source
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def insert_select(self, table, data, source, condition, condition_params, returning=None, on_conflict=None):
+        query, values = Database._build_insert_select(
+            table, data, source, condition, condition_params, returning, on_conflict
+        )
+        return self.execute_query(query, values)
+
+    def update(self, table, data, condition, condition_params, returning=None):
+        query, values = Database._build_update(table, data, condition, condition_params, returning)
+        return self.execute_query(query, values, fetch=bool(returning))
+
+    def delete(self, table, condition, condition_params, returning=None):
+        query, params = Database._build_delete(table, condition, condition_params, returning)
+        return self.execute_query(query, params, fetch=bool(returning))
+
+    def select(self, table, columns="*", condition=None, condition_params=None, order_by=None, for_update=False, limit=None, row_format=None):
+        query, params = Database._build_select(table, columns, condition, condition_params, order_by, for_update, limit)
+        return self.execute_query(query, params, row_format=row_format)
+
+    def stream(self, query, params=None, chunk_size=1000):
+        # Named cursors live on the server, so only chunk_size rows are
+        # held in memory at any time.
+        if isinstance(query, Statement):
+            query = query.sql
+        cursor = self.connection.cursor(name=f"stream_{uuid.uuid4().hex}")
+        cursor.itersize = chunk_size
+        try:
+            cursor.execute(query, params)
+            columns = None
+            for row in cursor:
+                if columns is None:
+                    columns = [desc[0].lower() for desc in cursor.description]
+                yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
 
 class Database:
+    _pool = None
+    _pool_lock = threading.Lock()
+    _statements = StatementCache(config.DB_STATEMENT_CACHE_SIZE)
+    _slow_queries = None
+
+    @staticmethod
+    def get_pool():
+        if Database._pool is None:
+            with Database._pool_lock:
+                if Database._pool is None:
+                    Database._pool = ConnectionPool(
+                        config.DB_CONFIG,
+                        min_size=config.DB_POOL_MIN_SIZE,
+                        max_size=config.DB_POOL_MAX_SIZE,
+                        timeout=config.DB_POOL_TIMEOUT,
+                        max_uses=config.DB_POOL_MAX_USES,
+                        max_lifetime=config.DB_POOL_MAX_LIFETIME,
+                        check_idle=config.DB_POOL_CHECK_IDLE,
+                        max_idle=config.DB_POOL_MAX_IDLE
+                    )
+                    # Opening DB_POOL_MIN_SIZE connections up front is an
+                    # optimization; if the server is down they open lazily.
+                    try:
+                        Database._pool.prefill()
+                    except psycopg2.Error as e:
+                        logger.warning("No se pudo precargar el pool de conexiones: %s", e)
+        return Database._pool
+
+    @staticmethod
+    def close_pool():
+        with Database._pool_lock:
+            pool, Database._pool = Database._pool, None
+        if pool is not None:
+            pool.closeall()
+
     @staticmethod
     def get_connection():
-        return psycopg2.connect(**config.DB_CONFIG)
+        if not config.DB_POOL_ENABLED:
+            return psycopg2.connect(**config.DB_CONFIG)
+        started = time.perf_counter()
+        connection = Database.get_pool().getconn()
+        if config.METRICS_ENABLED:
+            metrics.db_pool_wait.observe(time.perf_counter() - started)
+        return connection
 
     @staticmethod
-    def execute_query(query, params=None, fetch=True):
-        connection = None
-        try:
-            connection = Database.get_connection()
-            cursor = connection.cursor()
+    def release_connection(connection, discard=False):
+        if config.DB_POOL_ENABLED:
+            Database.get_pool().putconn(connection, discard)
+        else:
+            connection.close()
 
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
+    @staticmethod
+    def pool_stats():
+        if not config.DB_POOL_ENABLED:
+            return {'enabled': False}
+        stats = Database.get_pool().stats()
+        stats['enabled'] = True
+        return stats
 
-            result = None
-            if fetch and cursor.description:
-                columns = [desc[0].lower() for desc in cursor.description]
-                results = cursor.fetchall()
-                result = [dict(zip(columns, row)) for row in results]
-                if result:
-                    print(f"Resultado de la consulta: {result}")
+    @staticmethod
+    def pool_gauge():
+        if not config.DB_POOL_ENABLED or Database._pool is None:
+            return {}
+        stats = Database._pool.stats()
+        return {("in_use",): stats['in_use'], ("idle",): stats['idle']}
 
-            if not fetch:
-                connection.commit()
-                return True
+    @staticmethod
+    def statement_stats():
+        stats = Database._statements.stats()
+        stats['prepared_statements'] = config.DB_PREPARED_STATEMENTS and config.DB_POOL_ENABLED
+        return stats
 
-            connection.commit()
+    @staticmethod
+    def _explain(sql, params):
+        connection = Database.get_connection()
+        discard = False
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SET LOCAL statement_timeout = %s", (config.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,))
+            # Only plain reads are analyzed; everything else is just planned.
+            options = "(ANALYZE, BUFFERS)" if _analyzable(sql) else ""
+            cursor.execute(f"EXPLAIN {options} {sql}", params or None)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
             cursor.close()
-            return result
+            # ANALYZE really executes the statement, so it is always rolled back.
+            if not connection.closed:
+                connection.rollback()
+            Database.release_connection(connection, discard)
+
+    @staticmethod
+    def slow_queries():
+        return Database._slow_queries.entries()
+
+    @staticmethod
+    def slow_query_stats():
+        stats = Database._slow_queries.stats()
+        stats['threshold_ms'] = config.SLOW_QUERY_THRESHOLD_MS
+        stats['explain'] = config.SLOW_QUERY_EXPLAIN
+        return stats
+
+    @staticmethod
+    @contextmanager
+    def transaction():
+        connection = Database.get_connection()
+        discard = False
+        try:
+            yield Session(connection)
+            connection.commit()
         except psycopg2.Error as e:
-            if connection:
+            discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not connection.closed:
+                connection.rollback()
+            logger.error("Database error: %s", e)
+            raise
+        except Exception:
+            if not connection.closed:
                 connection.rollback()
-            print(f"Database error: {e}")
             raise
         finally:
-            if connection:
-                connection.close()
+            Database.release_connection(connection, discard)
 
     @staticmethod
-    def insert(table, data, returning=None):
-        columns = list(data.keys())
-        values = list(data.values())
+    def execute_query(query, params=None, fetch=True, row_format=None):
+        with Database.transaction() as session:
+            return session.execute_query(query, params, fetch, row_format)
 
-        placeholders = ", ".join(["%s"] * len(columns))
-        column_str = ", ".join(columns)
+    @staticmethod
+    def escape_like(text):
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
-        query = f"INSERT INTO {table} ({column_str}) VALUES ({placeholders})"
+    @staticmethod
+    def _as_list(params):
+        return list(params if isinstance(params, (list, tuple)) else [params])
 
-        if returning:
-            query += f" RETURNING {returning}"
+    @staticmethod
+    def _build_insert(table, data, returning=None, on_conflict=None):
+        columns = tuple(data.keys())
+
+        def build_sql():
+            placeholders = ", ".join(["%s"] * len(columns))
+            column_str = ", ".join(columns)
+
+            query = f"INSERT INTO {table} ({column_str}) VALUES ({placeholders})"
+
+            if on_conflict:
+                query += f" ON CONFLICT ({on_conflict}) DO NOTHING"
 
-        return Database.execute_query(query, tuple(values))
+            if returning:
+                query += f" RETURNING {returning}"
+            return query
+
+        key = ('insert', table, columns, returning, on_conflict)
+        return Database._statements.get(key, build_sql), tuple(data.values())
 
     @staticmethod
-    def update(table, data, condition, condition_params):
-        set_clause = ", ".join([f"{column} = %s" for column in data.keys()])
-        values = list(data.values()) + list(condition_params if isinstance(condition_params, (list, tuple)) else [condition_params])
+    def _build_insert_many(table, columns, returning=None, on_conflict=None):
+        def build_sql():
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s"
+
+            if on_conflict:
+                query += f" ON CONFLICT ({on_conflict}) DO NOTHING"
 
-        query = f"UPDATE {table} SET {set_clause} WHERE {condition}"
+            if returning:
+                query += f" RETURNING {returning}"
+            return query
 
-        return Database.execute_query(query, tuple(values), fetch=False)
+        # execute_values expands VALUES %s itself, so this is never prepared.
+        key = ('insert_many', table, columns, returning, on_conflict)
+        return Database._statements.get(key, build_sql, preparable=False)
 
     @staticmethod
-    def select(table, columns="*", condition=None, condition_params=None, order_by=None):
-        query = f"SELECT {columns} FROM {table}"
+    def _build_insert_select(table, data, source, condition, condition_params, returning=None, on_conflict=None):
+        columns = tuple(data.keys())
+        values = list(data.values()) + Database._as_list(condition_params)
+
+        def build_sql():
+            placeholders = ", ".join(["%s"] * len(columns))
+            column_str = ", ".join(columns)
+
+            query = f"INSERT INTO {table} ({column_str}) SELECT {placeholders} FROM {source} WHERE {condition}"
+
+            if on_conflict:
+                query += f" ON CONFLICT ({on_conflict}) DO NOTHING"
+
+            if returning:
+                query += f" RETURNING {returning}"
+            return query
+
+        key = ('insert_select', table, columns, source, condition, returning, on_conflict)
+        return Database._statements.get(key, build_sql), tuple(values)
+
+    @staticmethod
+    def _build_update(table, data, condition, condition_params, returning=None):
+        columns = tuple(data.keys())
+        values = list(data.values()) + Database._as_list(condition_params)
+
+        def build_sql():
+            set_clause = ", ".join([f"{column} = %s" for column in columns])
+            query = f"UPDATE {table} SET {set_clause} WHERE {condition}"
+
+            if returning:
+                query += f" RETURNING {returning}"
+            return query
+
+        key = ('update', table, columns, condition, returning)
+        return Database._statements.get(key, build_sql), tuple(values)
+
+    @staticmethod
+    def _build_delete(table, condition, condition_params, returning=None):
+        def build_sql():
+            query = f"DELETE FROM {table} WHERE {condition}"
+
+            if returning:
+                query += f" RETURNING {returning}"
+            return query
+
+        key = ('delete', table, condition, returning)
+        return Database._statements.get(key, build_sql), tuple(Database._as_list(condition_params))
+
+    @staticmethod
+    def _build_select(table, columns="*", condition=None, condition_params=None, order_by=None, for_update=False, limit=None):
+        params = list(condition_params) if condition_params else []
+        if limit is not None:
+            params.append(limit)
+
+        def build_sql():
+            query = f"SELECT {columns} FROM {table}"
+
+            if condition:
+                query += f" WHERE {condition}"
+
+            if order_by:
+                query += f" ORDER BY {order_by}"
+
+            if limit is not None:
+                query += " LIMIT %s"
+
+            if for_update:
+                query += " FOR UPDATE"
+            return query
+
+        key = ('select', table, columns, condition, order_by, for_update, limit is not None)
+        return Database._statements.get(key, build_sql), tuple(params) if params else None
+
+    @staticmethod
+    def insert(table, data, returning=None, on_conflict=None):
+        with Database.transaction() as session:
+            return session.insert(table, data, returning, on_conflict)
+
+    @staticmethod
+    def insert_select(table, data, source, condition, condition_params, returning=None, on_conflict=None):
+        with Database.transaction() as session:
+            return session.insert_select(table, data, source, condition, condition_params, returning, on_conflict)
+
+    @staticmethod
+    def update(table, data, condition, condition_params, returning=None):
+        with Database.transaction() as session:
+            return session.update(table, data, condition, condition_params, returning)
+
+    @staticmethod
+    def delete(table, condition, condition_params, returning=None):
+        with Database.transaction() as session:
+            return session.delete(table, condition, condition_params, returning)
+
+    @staticmethod
+    def select(table, columns="*", condition=None, condition_params=None, order_by=None, for_update=False, limit=None, row_format=None):
+        with Database.transaction() as session:
+            return session.select(table, columns, condition, condition_params, order_by, for_update, limit, row_format)
+
+    @staticmethod
+    def table_versions(tables):
+        names = sorted({table.lower() for table in tables})
+        rows = Database.select(
+            "version_tabla", "tabla, version", "tabla = ANY(%s)", (names,), row_format="tuple"
+        ) or []
+        versions = dict(rows)
+        return tuple(versions.get(name, 0) for name in names)
+
+    @staticmethod
+    def stream(query, params=None, chunk_size=None):
+        with Database.transaction() as session:
+            yield from session.stream(query, params, chunk_size or config.DB_STREAM_CHUNK_SIZE)
+
+    @staticmethod
+    def select_stream(table, columns="*", condition=None, condition_params=None, order_by=None, chunk_size=None):
+        query, params = Database._build_select(table, columns, condition, condition_params, order_by)
+        return Database.stream(query, params, chunk_size)
+
 
-        if condition:
-            query += f" WHERE {condition}"
+Database._slow_queries = SlowQueryLog(
+    Database._explain,
+    max_entries=config.SLOW_QUERY_LOG_SIZE,
+    explain_interval=config.SLOW_QUERY_EXPLAIN_INTERVAL
+)
 
-        if order_by:
-            query += f" ORDER BY {order_by}"
+atexit.register(Database.close_pool)
 
-        return Database.execute_query(query, condition_params if condition_params else None)
\ No newline at end of file
+metrics.registry.gauge(
+    "db_pool_connections", "Conexiones del pool por estado.", Database.pool_gauge, ("state",)
+)
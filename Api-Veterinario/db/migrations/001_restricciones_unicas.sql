@@ -0,0 +1,22 @@
+-- Restricciones únicas en las que se apoya el registro con
+-- INSERT ... ON CONFLICT DO NOTHING (models/user.py).
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'usuario_nombre_unico') THEN
+        ALTER TABLE Usuario ADD CONSTRAINT usuario_nombre_unico UNIQUE (nombre);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'cliente_usuario_unico') THEN
+        ALTER TABLE Cliente ADD CONSTRAINT cliente_usuario_unico UNIQUE (Usuario_idUsuario);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'empleado_usuario_unico') THEN
+        ALTER TABLE Empleado ADD CONSTRAINT empleado_usuario_unico UNIQUE (Usuario_idUsuario);
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'programador_usuario_unico') THEN
+        ALTER TABLE Programador ADD CONSTRAINT programador_usuario_unico UNIQUE (Usuario_idUsuario);
+    END IF;
+END
+$$;
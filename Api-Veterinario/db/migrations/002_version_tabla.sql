@@ -0,0 +1,108 @@
+-- Contador de versión por tabla, usado para generar ETags sin ejecutar
+-- la consulta completa (APIResponse.conditional). La versión se confirma
+-- en la misma transacción que los datos, así que nunca se adelanta a los
+-- datos visibles.
+--
+-- Las sentencias solo apuntan la tabla en version_pendiente (una fila por
+-- transacción y tabla, sin contención entre escritores). Un trigger
+-- diferido incrementa las versiones al confirmar y siempre en orden de
+-- nombre de tabla: la fila de version_tabla solo queda bloqueada durante
+-- el commit y dos transacciones que escriben varias tablas no pueden
+-- interbloquearse por ella.
+
+CREATE TABLE IF NOT EXISTS version_tabla (
+    tabla TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS version_pendiente (
+    transaccion BIGINT NOT NULL,
+    tabla TEXT NOT NULL,
+    PRIMARY KEY (transaccion, tabla)
+);
+
+CREATE OR REPLACE FUNCTION incrementar_version_tabla() RETURNS trigger AS $$
+BEGIN
+    -- Una sentencia que no cambia ninguna fila no invalida nada.
+    IF TG_OP = 'DELETE' THEN
+        PERFORM 1 FROM filas_antiguas LIMIT 1;
+    ELSIF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM 1 FROM filas_nuevas LIMIT 1;
+    END IF;
+
+    IF TG_OP = 'TRUNCATE' OR FOUND THEN
+        INSERT INTO version_pendiente (transaccion, tabla) VALUES (txid_current(), TG_TABLE_NAME)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION aplicar_version_pendiente() RETURNS trigger AS $$
+DECLARE
+    nombre_tabla TEXT;
+BEGIN
+    -- El primer disparo de la transacción aplica todas sus tablas; los
+    -- siguientes ya no encuentran nada pendiente.
+    FOR nombre_tabla IN
+        SELECT tabla FROM version_pendiente WHERE transaccion = txid_current() ORDER BY tabla
+    LOOP
+        INSERT INTO version_tabla (tabla, version) VALUES (nombre_tabla, 1)
+        ON CONFLICT (tabla) DO UPDATE SET version = version_tabla.version + 1;
+    END LOOP;
+    DELETE FROM version_pendiente WHERE transaccion = txid_current();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS version_pendiente_aplicar ON version_pendiente;
+CREATE CONSTRAINT TRIGGER version_pendiente_aplicar AFTER INSERT ON version_pendiente
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION aplicar_version_pendiente();
+
+-- Las tablas de transición solo se admiten con un evento por trigger.
+CREATE OR REPLACE FUNCTION vigilar_version_tabla(nombre_tabla TEXT) RETURNS void AS $$
+BEGIN
+    INSERT INTO version_tabla (tabla) VALUES (nombre_tabla) ON CONFLICT (tabla) DO NOTHING;
+
+    EXECUTE format('DROP TRIGGER IF EXISTS version_%s ON %I', nombre_tabla, nombre_tabla);
+    EXECUTE format('DROP TRIGGER IF EXISTS version_%s_insert ON %I', nombre_tabla, nombre_tabla);
+    EXECUTE format('DROP TRIGGER IF EXISTS version_%s_update ON %I', nombre_tabla, nombre_tabla);
+    EXECUTE format('DROP TRIGGER IF EXISTS version_%s_delete ON %I', nombre_tabla, nombre_tabla);
+    EXECUTE format('DROP TRIGGER IF EXISTS version_%s_truncate ON %I', nombre_tabla, nombre_tabla);
+
+    EXECUTE format(
+        'CREATE TRIGGER version_%s_insert AFTER INSERT ON %I REFERENCING NEW TABLE AS filas_nuevas '
+        'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()',
+        nombre_tabla, nombre_tabla
+    );
+    EXECUTE format(
+        'CREATE TRIGGER version_%s_update AFTER UPDATE ON %I REFERENCING NEW TABLE AS filas_nuevas '
+        'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()',
+        nombre_tabla, nombre_tabla
+    );
+    EXECUTE format(
+        'CREATE TRIGGER version_%s_delete AFTER DELETE ON %I REFERENCING OLD TABLE AS filas_antiguas '
+        'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()',
+        nombre_tabla, nombre_tabla
+    );
+    EXECUTE format(
+        'CREATE TRIGGER version_%s_truncate AFTER TRUNCATE ON %I '
+        'FOR EACH STATEMENT EXECUTE FUNCTION incrementar_version_tabla()',
+        nombre_tabla, nombre_tabla
+    );
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    nombre_tabla TEXT;
+BEGIN
+    FOREACH nombre_tabla IN ARRAY ARRAY['usuario', 'cliente', 'empleado', 'programador', 'mascota', 'servicio', 'cita']
+    LOOP
+        IF to_regclass(nombre_tabla) IS NOT NULL THEN
+            PERFORM vigilar_version_tabla(nombre_tabla);
+        END IF;
+    END LOOP;
+END
+$$;
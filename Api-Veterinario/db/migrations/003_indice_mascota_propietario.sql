@@ -0,0 +1,8 @@
+-- Índice compuesto para el listado de mascotas por propietario con
+-- paginación por clave (id_usuario = %s AND id_mascota > %s ORDER BY
+-- id_mascota). Cubre también las búsquedas solo por id_usuario, por lo
+-- que sustituye a idx_mascota_usuario.
+
+CREATE INDEX IF NOT EXISTS idx_mascota_usuario_id ON mascota (id_usuario, id_mascota);
+
+DROP INDEX IF EXISTS idx_mascota_usuario;
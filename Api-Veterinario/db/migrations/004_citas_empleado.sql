@@ -0,0 +1,24 @@
+-- Citas asignadas a un empleado (services/scheduling_service.py).
+-- script-database.sql ya indexaba cita(id_empleado) sin crear la columna.
+-- La restricción de exclusión impide que dos citas activas de un mismo
+-- empleado se solapen, incluso con reservas concurrentes.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE cita ADD COLUMN IF NOT EXISTS id_empleado INTEGER REFERENCES Usuario(idUsuario) ON DELETE RESTRICT;
+
+ALTER TABLE servicio ADD COLUMN IF NOT EXISTS duracion_minutos INTEGER NOT NULL DEFAULT 30
+    CHECK (duracion_minutos > 0);
+
+CREATE INDEX IF NOT EXISTS idx_cita_empleado_fecha ON cita (id_empleado, fecha);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'cita_sin_solapes') THEN
+        ALTER TABLE cita ADD CONSTRAINT cita_sin_solapes EXCLUDE USING gist (
+            id_empleado WITH =,
+            tsrange(fecha + hora_inicio, fecha + hora_final) WITH &&
+        ) WHERE (NOT is_canceled);
+    END IF;
+END
+$$;
@@ -0,0 +1,127 @@
+-- Versión materializada de vista_citas_detalle para el calendario
+-- (models/calendar.py). Los disparadores la mantienen al día fila a fila
+-- cuando cambian las citas o los datos que muestra, así que leer una
+-- semana es un recorrido de índice por fecha en lugar de cinco joins.
+
+CREATE TABLE IF NOT EXISTS calendario_citas (
+    id_cita UUID PRIMARY KEY,
+    fecha DATE NOT NULL,
+    hora_inicio TIME NOT NULL,
+    hora_final TIME NOT NULL,
+    is_canceled BOOLEAN NOT NULL,
+    id_servicio INTEGER,
+    servicio VARCHAR(100),
+    id_mascota UUID NOT NULL,
+    mascota VARCHAR(100),
+    especie VARCHAR(50),
+    id_propietario INTEGER,
+    propietario VARCHAR(100),
+    id_empleado INTEGER,
+    empleado_asignado VARCHAR(200)
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendario_fecha ON calendario_citas (fecha, hora_inicio);
+CREATE INDEX IF NOT EXISTS idx_calendario_empleado_fecha ON calendario_citas (id_empleado, fecha, hora_inicio);
+CREATE INDEX IF NOT EXISTS idx_calendario_propietario_fecha ON calendario_citas (id_propietario, fecha, hora_inicio);
+
+CREATE OR REPLACE FUNCTION refrescar_calendario_citas(p_ids UUID[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM calendario_citas WHERE id_cita = ANY(p_ids);
+
+    INSERT INTO calendario_citas (id_cita, fecha, hora_inicio, hora_final, is_canceled, id_servicio, servicio,
+                                  id_mascota, mascota, especie, id_propietario, propietario,
+                                  id_empleado, empleado_asignado)
+    SELECT c.id_cita, c.fecha, c.hora_inicio, c.hora_final, c.is_canceled, c.id_servicio, s.nombre_servicio,
+           c.id_mascota, m.nombre, m.especie, m.id_usuario, u_cliente.nombre,
+           c.id_empleado, COALESCE(e.nombre_completo, u_empleado.nombre)
+    FROM cita c
+    LEFT JOIN servicio s ON s.id_servicio = c.id_servicio
+    LEFT JOIN mascota m ON m.id_mascota = c.id_mascota
+    LEFT JOIN Usuario u_cliente ON u_cliente.idUsuario = m.id_usuario
+    LEFT JOIN Usuario u_empleado ON u_empleado.idUsuario = c.id_empleado
+    LEFT JOIN Empleado e ON e.Usuario_idUsuario = c.id_empleado
+    WHERE c.id_cita = ANY(p_ids);
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION calendario_por_cita() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM calendario_citas WHERE id_cita = OLD.id_cita;
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.id_cita <> NEW.id_cita THEN
+        DELETE FROM calendario_citas WHERE id_cita = OLD.id_cita;
+    END IF;
+    PERFORM refrescar_calendario_citas(ARRAY[NEW.id_cita]);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION calendario_por_mascota() RETURNS trigger AS $$
+BEGIN
+    PERFORM refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita WHERE id_mascota = NEW.id_mascota));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION calendario_por_servicio() RETURNS trigger AS $$
+BEGIN
+    UPDATE calendario_citas SET servicio = NEW.nombre_servicio WHERE id_servicio = NEW.id_servicio;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION calendario_por_usuario() RETURNS trigger AS $$
+BEGIN
+    UPDATE calendario_citas SET propietario = NEW.nombre WHERE id_propietario = NEW.idUsuario;
+    PERFORM refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita WHERE id_empleado = NEW.idUsuario));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION calendario_por_empleado() RETURNS trigger AS $$
+BEGIN
+    -- Sin ficha de empleado, sus citas vuelven a mostrar el nombre de usuario.
+    IF TG_OP = 'DELETE' THEN
+        PERFORM refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita WHERE id_empleado = OLD.Usuario_idUsuario));
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.Usuario_idUsuario <> NEW.Usuario_idUsuario THEN
+        PERFORM refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita WHERE id_empleado = OLD.Usuario_idUsuario));
+    END IF;
+    PERFORM refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita WHERE id_empleado = NEW.Usuario_idUsuario));
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS calendario_cita ON cita;
+CREATE TRIGGER calendario_cita AFTER INSERT OR UPDATE OR DELETE ON cita
+    FOR EACH ROW EXECUTE FUNCTION calendario_por_cita();
+
+DROP TRIGGER IF EXISTS calendario_mascota ON mascota;
+CREATE TRIGGER calendario_mascota AFTER UPDATE OF nombre, especie, id_usuario ON mascota
+    FOR EACH ROW WHEN (OLD.nombre IS DISTINCT FROM NEW.nombre
+                       OR OLD.especie IS DISTINCT FROM NEW.especie
+                       OR OLD.id_usuario IS DISTINCT FROM NEW.id_usuario)
+    EXECUTE FUNCTION calendario_por_mascota();
+
+DROP TRIGGER IF EXISTS calendario_servicio ON servicio;
+CREATE TRIGGER calendario_servicio AFTER UPDATE OF nombre_servicio ON servicio
+    FOR EACH ROW WHEN (OLD.nombre_servicio IS DISTINCT FROM NEW.nombre_servicio)
+    EXECUTE FUNCTION calendario_por_servicio();
+
+DROP TRIGGER IF EXISTS calendario_usuario ON Usuario;
+CREATE TRIGGER calendario_usuario AFTER UPDATE OF nombre ON Usuario
+    FOR EACH ROW WHEN (OLD.nombre IS DISTINCT FROM NEW.nombre)
+    EXECUTE FUNCTION calendario_por_usuario();
+
+DROP TRIGGER IF EXISTS calendario_empleado ON Empleado;
+CREATE TRIGGER calendario_empleado AFTER INSERT OR UPDATE OF nombre_completo, Usuario_idUsuario OR DELETE ON Empleado
+    FOR EACH ROW EXECUTE FUNCTION calendario_por_empleado();
+
+-- Carga inicial de las citas existentes.
+SELECT refrescar_calendario_citas(ARRAY(SELECT id_cita FROM cita));
+
+-- ETag de los endpoints del calendario (APIResponse.conditional).
+SELECT vigilar_version_tabla('calendario_citas');
@@ -0,0 +1,41 @@
+-- Catálogo de roles y servicios que la API carga en memoria al arrancar
+-- (services/catalog_service.py). Cualquier cambio en estas tablas
+-- incrementa su versión y emite NOTIFY catalogo para que cada proceso
+-- recargue su copia.
+
+CREATE TABLE IF NOT EXISTS rol (
+    id_rol INTEGER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    nombre_rol TEXT NOT NULL UNIQUE
+);
+
+-- script-database.sql limitaba los roles a cliente, empleado y admin;
+-- la API usa además programador.
+ALTER TABLE rol DROP CONSTRAINT IF EXISTS rol_nombre_rol_check;
+
+INSERT INTO rol (nombre_rol) VALUES ('programador'), ('empleado'), ('cliente')
+ON CONFLICT (nombre_rol) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION notificar_catalogo() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('catalogo', TG_TABLE_NAME);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    nombre_tabla TEXT;
+BEGIN
+    FOREACH nombre_tabla IN ARRAY ARRAY['rol', 'servicio']
+    LOOP
+        PERFORM vigilar_version_tabla(nombre_tabla);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS catalogo_%s ON %I', nombre_tabla, nombre_tabla);
+        EXECUTE format(
+            'CREATE TRIGGER catalogo_%s AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION notificar_catalogo()',
+            nombre_tabla, nombre_tabla
+        );
+    END LOOP;
+END
+$$;
@@ -0,0 +1,16 @@
+-- Búsqueda por nombre parcial de usuarios y mascotas (GET /usuarios/buscar,
+-- /mascotas/buscar y sus variantes de autocompletado). Los índices GIN de
+-- trigramas sirven tanto a LIKE '%texto%' y LIKE 'prefijo%' como a los
+-- operadores de similitud % y <%.
+-- Las expresiones deben coincidir exactamente con las de models/user.py y
+-- models/pet.py para que el planificador use los índices.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_usuario_nombre_trgm ON Usuario USING gin (lower(nombre) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_mascota_nombre_trgm ON mascota USING gin (lower(nombre) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_mascota_busqueda_trgm ON mascota USING gin (
+    lower(nombre || ' ' || coalesce(raza, '') || ' ' || especie) gin_trgm_ops
+);
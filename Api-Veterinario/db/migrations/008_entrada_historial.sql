@@ -0,0 +1,43 @@
+-- Historial médico como registro de solo inserción (models/medical_history.py).
+-- Cada consulta añade una fila en lugar de reescribir mascota.historial_medico,
+-- y las lecturas recorren el índice (id_mascota, id_entrada) página a página.
+
+CREATE TABLE IF NOT EXISTS entrada_historial (
+    id_entrada BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    id_mascota UUID NOT NULL REFERENCES mascota(id_mascota) ON DELETE CASCADE,
+    fecha TIMESTAMPTZ NOT NULL DEFAULT now(),
+    id_autor INTEGER REFERENCES Usuario(idUsuario) ON DELETE SET NULL,
+    texto TEXT NOT NULL CHECK (btrim(texto) <> '')
+);
+
+CREATE INDEX IF NOT EXISTS idx_entrada_historial_mascota ON entrada_historial (id_mascota, id_entrada DESC);
+
+-- Las entradas no se modifican ni se borran una a una; solo desaparecen
+-- en cascada al eliminar la mascota (la acción de la clave foránea se
+-- ejecuta desde otro trigger, con pg_trigger_depth() > 1).
+CREATE OR REPLACE FUNCTION proteger_entrada_historial() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' AND pg_trigger_depth() > 1 THEN
+        RETURN OLD;
+    END IF;
+    RAISE EXCEPTION 'entrada_historial es de solo inserción';
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS solo_insercion_entrada_historial ON entrada_historial;
+CREATE TRIGGER solo_insercion_entrada_historial BEFORE UPDATE OR DELETE ON entrada_historial
+FOR EACH ROW EXECUTE FUNCTION proteger_entrada_historial();
+
+SELECT vigilar_version_tabla('entrada_historial');
+
+-- Cada texto existente pasa a ser la primera entrada de su mascota y la
+-- columna se vacía para liberar su espacio TOAST (tras el próximo VACUUM).
+-- Repetir la migración no duplica nada: solo quedan textos sin migrar.
+INSERT INTO entrada_historial (id_mascota, texto)
+SELECT id_mascota, historial_medico
+FROM mascota
+WHERE historial_medico IS NOT NULL AND btrim(historial_medico) <> '';
+
+UPDATE mascota SET historial_medico = NULL WHERE historial_medico IS NOT NULL;
+
+COMMENT ON COLUMN mascota.historial_medico IS 'Obsoleta: el historial está en entrada_historial';
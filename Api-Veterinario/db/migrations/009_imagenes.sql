@@ -0,0 +1,29 @@
+-- Las imágenes se guardan en disco por su hash SHA-256
+-- (services/image_service.py); las columnas imagen solo contienen ese hash.
+-- El frontend guardaba URLs en mascota.imagen, así que el formato se exige
+-- con un trigger y solo cuando una sentencia escribe la columna imagen:
+-- una restricción CHECK, incluso NOT VALID, se vuelve a evaluar en cualquier
+-- UPDATE de la fila y rechazaría las ediciones de esas mascotas antiguas.
+
+ALTER TABLE Usuario ADD COLUMN IF NOT EXISTS imagen TEXT;
+
+ALTER TABLE Usuario DROP CONSTRAINT IF EXISTS usuario_imagen_hash;
+ALTER TABLE mascota DROP CONSTRAINT IF EXISTS mascota_imagen_hash;
+
+CREATE OR REPLACE FUNCTION validar_imagen_hash() RETURNS trigger AS $$
+BEGIN
+    IF NEW.imagen IS NOT NULL AND NEW.imagen !~ '^[0-9a-f]{64}$' THEN
+        RAISE EXCEPTION 'imagen debe ser un hash SHA-256 en hexadecimal'
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS imagen_hash_usuario ON Usuario;
+CREATE TRIGGER imagen_hash_usuario BEFORE INSERT OR UPDATE OF imagen ON Usuario
+FOR EACH ROW EXECUTE FUNCTION validar_imagen_hash();
+
+DROP TRIGGER IF EXISTS imagen_hash_mascota ON mascota;
+CREATE TRIGGER imagen_hash_mascota BEFORE INSERT OR UPDATE OF imagen ON mascota
+FOR EACH ROW EXECUTE FUNCTION validar_imagen_hash();
@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    pass
+
+
+class PooledConnection(extensions.connection):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+        self.uses = 0
+        self.pool_pid = os.getpid()
+        self.prepared = OrderedDict()
+
+
+class ConnectionPool:
+
+    def __init__(self, connect_kwargs, min_size=1, max_size=10, timeout=5.0,
+                 max_uses=1000, max_lifetime=1800.0, check_idle=30.0, max_idle=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Tamaño de pool no válido")
+
+        self.connect_kwargs = dict(connect_kwargs)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self.max_idle = max_idle
+        self._orphans = []
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = deque()
+        self._in_use = set()
+        self._size = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'discarded': 0,
+            'failed_checks': 0,
+            'reaped': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+        }
+        self._reaper_stop = threading.Event()
+        if self.max_idle:
+            # Threads do not survive a fork; _check_fork starts a new one.
+            threading.Thread(
+                target=self._reap_loop, args=(self._reaper_stop,), name="pool-reaper", daemon=True
+            ).start()
+
+    def _reap_loop(self, stop):
+        while not stop.wait(max(self.max_idle / 2, 1.0)):
+            self.reap()
+
+    def reap(self):
+        # Closes idle connections above min_size that have not been used
+        # for max_idle seconds. The idle deque is LIFO, so the oldest are
+        # on the left.
+        if self._pid != os.getpid():
+            return 0
+        now = time.monotonic()
+        reaped = []
+        with self._lock:
+            while (self._idle and self._size > self.min_size
+                   and now - self._idle[0].last_used_at >= self.max_idle):
+                reaped.append(self._idle.popleft())
+                self._size -= 1
+                self._stats['reaped'] += 1
+        for connection in reaped:
+            self._close_quietly(connection)
+        return len(reaped)
+
+    def _check_fork(self):
+        if self._pid != os.getpid():
+            # The child must never close sockets shared with the parent, so
+            # inherited connections are kept referenced and simply forgotten.
+            self._orphans.extend(self._idle)
+            self._orphans.extend(self._in_use)
+            self._reset()
+
+    def _connect(self):
+        connection = psycopg2.connect(connection_factory=PooledConnection, **self.connect_kwargs)
+        with self._lock:
+            self._stats['created'] += 1
+        return connection
+
+    def _expired(self, connection, now):
+        if self.max_uses and connection.uses >= self.max_uses:
+            return True
+        if self.max_lifetime and now - connection.created_at >= self.max_lifetime:
+            return True
+        return False
+
+    def _is_alive(self, connection, now):
+        if connection.closed:
+            return False
+        if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if self.check_idle is not None and now - connection.last_used_at >= self.check_idle:
+            try:
+                cursor = connection.cursor()
+                cursor.execute("SELECT 1")
+                cursor.close()
+                connection.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def _close_quietly(self, connection):
+        try:
+            if not connection.closed:
+                connection.close()
+        except psycopg2.Error:
+            pass
+
+    def _forget(self, connection, counter):
+        # Caller holds the lock.
+        self._in_use.discard(connection)
+        self._size -= 1
+        self._stats[counter] += 1
+        self._available.notify()
+
+    def prefill(self):
+        self._check_fork()
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._connect()
+            except psycopg2.Error:
+                with self._lock:
+                    self._size -= 1
+                    self._available.notify()
+                raise
+            with self._lock:
+                self._idle.append(connection)
+                self._available.notify()
+
+    def getconn(self):
+        self._check_fork()
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout is not None else None
+
+        while True:
+            connection = None
+            must_connect = False
+
+            with self._lock:
+                if self._closed:
+                    raise psycopg2.InterfaceError("El pool de conexiones está cerrado")
+
+                while not self._idle and self._size >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No hay conexiones disponibles tras {self.timeout} segundos"
+                        )
+                    self._available.wait(remaining)
+
+                if self._idle:
+                    connection = self._idle.pop()
+                else:
+                    self._size += 1
+                    must_connect = True
+
+            if must_connect:
+                try:
+                    connection = self._connect()
+                except psycopg2.Error:
+                    with self._lock:
+                        self._size -= 1
+                        self._available.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                if self._expired(connection, now):
+                    self._close_quietly(connection)
+                    with self._lock:
+                        self._forget(connection, 'recycled')
+                    continue
+                if not self._is_alive(connection, now):
+                    self._close_quietly(connection)
+                    with self._lock:
+                        self._forget(connection, 'failed_checks')
+                    continue
+
+            waited = time.monotonic() - started
+            with self._lock:
+                self._in_use.add(connection)
+                self._stats['checkouts'] += 1
+                self._stats['wait_time_total'] += waited
+                self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+            connection.uses += 1
+            return connection
+
+    def putconn(self, connection, discard=False):
+        if getattr(connection, 'pool_pid', None) != self._pid:
+            # Checked out before a fork, or not ours at all.
+            return
+
+        if not discard and not connection.closed:
+            try:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        now = time.monotonic()
+        recycle = self._expired(connection, now)
+
+        if discard or recycle or connection.closed or self._closed:
+            self._close_quietly(connection)
+            with self._lock:
+                if connection in self._in_use:
+                    self._forget(connection, 'recycled' if recycle and not discard else 'discarded')
+            return
+
+        connection.last_used_at = now
+        with self._lock:
+            self._in_use.discard(connection)
+            self._idle.append(connection)
+            self._available.notify()
+
+    def closeall(self):
+        self._reaper_stop.set()
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._available.notify_all()
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'created': self._stats['created'],
+                'recycled': self._stats['recycled'],
+                'discarded': self._stats['discarded'],
+                'failed_checks': self._stats['failed_checks'],
+                'reaped': self._stats['reaped'],
+                'wait_time_total': round(self._stats['wait_time_total'], 6),
+                'wait_time_avg': round(self._stats['wait_time_total'] / checkouts, 6) if checkouts else 0.0,
+                'wait_time_max': round(self._stats['wait_time_max'], 6),
+            }
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from functools import lru_cache
+
+ROW_FORMATS = ('dict', 'tuple', 'namedtuple', 'slots')
+
+
+class Row:
+    __slots__ = ('_values',)
+    _columns = ()
+    _index = {}
+
+    def __init__(self, values):
+        self._values = values
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def __getattr__(self, name):
+        # copy and pickle probe dunders on an instance whose _values slot
+        # is not set yet; looking it up here would recurse forever.
+        if name.startswith('__') or name == '_values':
+            raise AttributeError(name)
+        try:
+            return self._values[self._index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self._columns == other._columns and self._values == other._values
+        if isinstance(other, dict):
+            return self._asdict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Row({self._asdict()!r})"
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self):
+        return self._columns
+
+    def values(self):
+        return self._values
+
+    def items(self):
+        return zip(self._columns, self._values)
+
+    def _asdict(self):
+        return dict(zip(self._columns, self._values))
+
+
+@lru_cache(maxsize=256)
+def row_factory(row_format, columns):
+    if row_format == 'dict':
+        return lambda values: dict(zip(columns, values))
+    if row_format == 'tuple':
+        return tuple
+    if row_format == 'namedtuple':
+        return namedtuple('Row', columns, rename=True)._make
+    if row_format == 'slots':
+        row_class = type('Row', (Row,), {
+            '__slots__': (),
+            '_columns': columns,
+            '_index': {column: index for index, column in enumerate(columns)},
+        })
+        return row_class
+    raise ValueError(f"Formato de fila no válido: {row_format}")
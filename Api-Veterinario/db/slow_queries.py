@@ -0,0 +1,127 @@
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+def params_shape(params):
+    # Only types are kept: parameters may carry password hashes or personal data.
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+class SlowQueryLog:
+
+    def __init__(self, explain, max_entries=50, explain_interval=300.0, queue_size=100):
+        self.explain = explain
+        self.max_entries = max_entries
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._pid = None
+        self._dropped = 0
+
+    def record(self, shape, sql, params, duration, rows, capture_plan=True):
+        now = time.time()
+        duration_ms = round(duration * 1000, 3)
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    # Keep the worst offenders: evict the mildest one, or
+                    # drop this query if it is milder than all of them.
+                    mildest = min(self._entries, key=lambda key: self._entries[key]['duration_ms'])
+                    if self._entries[mildest]['duration_ms'] >= duration_ms:
+                        return
+                    del self._entries[mildest]
+                entry = self._entries[shape] = {
+                    'sql': shape,
+                    'count': 0,
+                    'duration_ms': 0.0,
+                    'plan': None,
+                    'plan_captured_at': None,
+                    'explain_requested_at': None,
+                }
+            entry['count'] += 1
+            entry['params'] = params_shape(params)
+            entry['last_duration_ms'] = duration_ms
+            entry['duration_ms'] = max(entry['duration_ms'], duration_ms)
+            entry['rows'] = rows
+            entry['last_seen'] = now
+
+            explain = (
+                capture_plan
+                and shape.split(None, 1)[0].lower() in EXPLAINABLE
+                and (entry['explain_requested_at'] is None
+                     or now - entry['explain_requested_at'] >= self.explain_interval)
+            )
+            if explain:
+                entry['explain_requested_at'] = now
+
+        logger.warning("Consulta lenta (%.1f ms, %s filas): %s params=%s",
+                       duration_ms, rows, shape, params_shape(params))
+        if explain:
+            self._enqueue(shape, sql, params)
+
+    def _enqueue(self, shape, sql, params):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((shape, sql, params))
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so a worker process starts its own.
+        if self._worker is None or self._pid != os.getpid() or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or self._pid != os.getpid() or not self._worker.is_alive():
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                    self._worker = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                    self._pid = os.getpid()
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            shape, sql, params = self._queue.get()
+            try:
+                plan = self.explain(sql, params)
+            except Exception as e:
+                plan = f"No se pudo obtener el plan: {e}"
+            with self._lock:
+                entry = self._entries.get(shape)
+                if entry is not None:
+                    entry['plan'] = plan
+                    entry['plan_captured_at'] = time.time()
+            logger.warning("Plan de la consulta lenta %s:\n%s", shape, plan)
+
+    def entries(self):
+        with self._lock:
+            entries = [
+                {key: value for key, value in entry.items() if key != 'explain_requested_at'}
+                for entry in self._entries.values()
+            ]
+        return sorted(entries, key=lambda entry: entry['duration_ms'], reverse=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'pending_explains': self._queue.qsize(),
+                'dropped_explains': self._dropped,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,102 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+
+
+def to_numbered_placeholders(sql):
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group(0) == "%%":
+            return "%"
+        counter += 1
+        return f"${counter}"
+
+    return _PLACEHOLDER.sub(replace, sql), counter
+
+
+class Statement:
+    __slots__ = ('key', 'sql', 'name', 'prepare_sql', 'execute_sql', 'hits')
+
+    def __init__(self, key, sql, preparable=True):
+        self.key = key
+        self.sql = sql
+        self.hits = 0
+        self.name = None
+        self.prepare_sql = None
+        self.execute_sql = None
+
+        if preparable and "%(" not in sql:
+            numbered_sql, param_count = to_numbered_placeholders(sql)
+            self.name = "st_" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+            self.prepare_sql = f"PREPARE {self.name} AS {numbered_sql}"
+            if param_count:
+                self.execute_sql = f"EXECUTE {self.name} ({', '.join(['%s'] * param_count)})"
+            else:
+                self.execute_sql = f"EXECUTE {self.name}"
+
+
+class StatementCache:
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._statements = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._prepares = 0
+        self._prepared_hits = 0
+        self._deallocations = 0
+
+    def get(self, key, build_sql, preparable=True):
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                self._statements.move_to_end(key)
+                self._hits += 1
+                statement.hits += 1
+                return statement
+            self._misses += 1
+
+        statement = Statement(key, build_sql(), preparable)
+
+        with self._lock:
+            self._statements[key] = statement
+            self._statements.move_to_end(key)
+            while len(self._statements) > self.max_size:
+                self._statements.popitem(last=False)
+        return statement
+
+    def record_prepare(self, hit, deallocated=0):
+        with self._lock:
+            if hit:
+                self._prepared_hits += 1
+            else:
+                self._prepares += 1
+            self._deallocations += deallocated
+
+    def clear(self):
+        with self._lock:
+            self._statements.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._statements),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'prepares': self._prepares,
+                'prepared_hits': self._prepared_hits,
+                'deallocations': self._deallocations,
+                'top': [
+                    {'sql': statement.sql, 'hits': statement.hits}
+                    for statement in sorted(self._statements.values(), key=lambda item: item.hits, reverse=True)[:10]
+                ],
+            }
@@ -0,0 +1,86 @@
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+
+
+def find_bin_dir():
+    configured = os.environ.get("PG_BIN")
+    if configured:
+        return configured
+    initdb = shutil.which("initdb")
+    if initdb:
+        return os.path.dirname(initdb)
+    candidates = sorted(glob.glob("/usr/lib/postgresql/*/bin") + glob.glob("/usr/local/pgsql/bin"))
+    if candidates:
+        return candidates[-1]
+    raise RuntimeError("No se encontró initdb; instala PostgreSQL o define PG_BIN")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TemporaryPostgres:
+
+    def __init__(self, bin_dir=None, port=None, max_connections=200):
+        self.bin_dir = bin_dir or find_bin_dir()
+        self.port = port or free_port()
+        self.max_connections = max_connections
+        self.directory = None
+
+    def _run(self, program, *args):
+        subprocess.run(
+            [os.path.join(self.bin_dir, program), *args],
+            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+
+    def start(self):
+        self.directory = tempfile.mkdtemp(prefix="cuidapet_pg_")
+        data = os.path.join(self.directory, "data")
+        try:
+            self._run("initdb", "-D", data, "-U", "postgres", "-A", "trust", "-E", "UTF8", "--locale=C")
+            # Durability is irrelevant for a throwaway cluster.
+            options = (
+                f"-p {self.port} -k {self.directory} -c listen_addresses=127.0.0.1 "
+                f"-c max_connections={self.max_connections} "
+                "-c fsync=off -c synchronous_commit=off -c full_page_writes=off"
+            )
+            self._run("pg_ctl", "-D", data, "-l", os.path.join(self.directory, "postgres.log"),
+                      "-o", options, "-w", "start")
+        except subprocess.CalledProcessError as e:
+            self.stop()
+            raise RuntimeError(f"No se pudo arrancar PostgreSQL: {e.stderr.decode(errors='replace')}") from e
+        return self
+
+    def stop(self):
+        if self.directory is None:
+            return
+        data = os.path.join(self.directory, "data")
+        if os.path.exists(os.path.join(data, "postmaster.pid")):
+            try:
+                self._run("pg_ctl", "-D", data, "-m", "fast", "-w", "stop")
+            except subprocess.CalledProcessError:
+                pass
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = None
+
+    def db_config(self):
+        return {
+            'host': "127.0.0.1",
+            'port': str(self.port),
+            'dbname': "postgres",
+            'user': "postgres",
+            'password': "",
+            'options': "-c search_path=public",
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,242 @@
+import argparse
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import make_server
+
+import config
+from loadtest import seed as seeding
+from loadtest.postgres import TemporaryPostgres
+from utils.security import Security
+
+OPERATIONS = ("login", "registrar", "registrar_cliente", "obtener_usuarios")
+DEFAULT_MIX = "login=40,obtener_usuarios=40,registrar=10,registrar_cliente=10"
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prueba de carga de extremo a extremo contra create_app() y un PostgreSQL desechable."
+    )
+    parser.add_argument("--usuarios", type=int, default=10000, help="Usuarios a sembrar")
+    parser.add_argument("--mascotas", type=int, default=15000, help="Mascotas a sembrar")
+    parser.add_argument("--citas", type=int, default=30000, help="Citas a sembrar")
+    parser.add_argument("--pendientes", type=int, default=5000,
+                        help="Clientes sin perfil disponibles para /registrar_cliente")
+    parser.add_argument("--mezcla", type=parse_mix, action="append",
+                        help=f"Pesos por operación (se puede repetir). Por defecto: {DEFAULT_MIX}")
+    parser.add_argument("--concurrencia", default="8",
+                        help="Clientes concurrentes; una lista separada por comas ejecuta varias rondas")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos por ronda")
+    parser.add_argument("--calentamiento", type=float, default=3, help="Segundos de calentamiento por ronda")
+    parser.add_argument("--semilla", type=int, default=1234, help="Semilla del generador de tráfico")
+    parser.add_argument("--dsn", help="Usar una base de datos vacía existente en lugar de una desechable "
+                                      "(formato clave=valor de libpq)")
+    parser.add_argument("--url", help="Atacar un servidor ya arrancado en lugar de create_app() en un hilo")
+    parser.add_argument("--salida", help="Archivo JSON para el informe")
+    return parser.parse_args(argv)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation, status, elapsed):
+        with self._lock:
+            self.latencies[operation].append(elapsed)
+            self.statuses[operation][status] += 1
+
+    def report(self, elapsed):
+        report = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            latencies = sorted(latencies)
+            statuses = dict(self.statuses[operation])
+            ok = sum(count for status, count in statuses.items() if isinstance(status, int) and status < 400)
+            report[operation] = {
+                'peticiones': len(latencies),
+                'correctas': ok,
+                'errores': len(latencies) - ok,
+                'por_segundo': round(len(latencies) / elapsed, 2) if elapsed else None,
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'max_ms': round(latencies[-1] * 1000, 2),
+                'estados': {str(status): count for status, count in statuses.items()},
+            }
+        return report
+
+
+class Traffic:
+
+    def __init__(self, base_url, seeded, users):
+        self.base_url = base_url.rstrip("/")
+        self.admin_token = Security.generate_token(seeded['admin'])
+        self._pending = iter(seeded['pendientes'])
+        self._pending_lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self.max_user_id = max(1, users - 100)
+        # Logins hit a small hot set, like real users returning to the app.
+        self.users = [f"carga_cliente_{index}" for index in range(1, min(users, 100) + 1)]
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+        except OSError as e:
+            return type(e).__name__
+
+    def login(self, rng):
+        return self.request("POST", "/login", {"nombre": rng.choice(self.users), "contraseña": seeding.PASSWORD})
+
+    def registrar(self, rng):
+        name = f"carga_nuevo_{threading.get_ident()}_{next(self._counter)}"
+        return self.request("POST", "/registrar", {"nombre": name, "contraseña": seeding.PASSWORD, "rol": "cliente"})
+
+    def registrar_cliente(self, rng):
+        with self._pending_lock:
+            user = next(self._pending, None)
+        if user is None:
+            return None
+        return self.request("POST", "/registrar_cliente",
+                            {"direccion": "Calle Carga 2", "telefono": "600111222"}, Security.generate_token(user))
+
+    def obtener_usuarios(self, rng):
+        after_id = rng.randint(0, self.max_user_id)
+        return self.request("GET", f"/obtener_usuarios?limit=100&after_id={after_id}", token=self.admin_token)
+
+
+def run_round(traffic, mix, concurrency, duration, warmup, seed):
+    operations = list(mix)
+    weights = [mix[name] for name in operations]
+    recorder = Recorder()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                return
+            operation = rng.choices(operations, weights)[0]
+            request_started = time.perf_counter()
+            status = getattr(traffic, operation)(rng)
+            if status is None:
+                # Nothing left for this operation (no pending clients).
+                if len(operations) == 1:
+                    return
+                continue
+            if request_started >= measure_from:
+                recorder.record(operation, status, time.perf_counter() - request_started)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+
+    report = recorder.report(duration)
+    total = sum(item['peticiones'] for item in report.values())
+    return {
+        'mezcla': mix,
+        'concurrencia': concurrency,
+        'duracion': duration,
+        'total_por_segundo': round(total / duration, 2),
+        'endpoints': report,
+    }
+
+
+def print_round(result):
+    print(f"\nConcurrencia {result['concurrencia']}, mezcla {result['mezcla']}: "
+          f"{result['total_por_segundo']} peticiones/s")
+    print(f"  {'endpoint':<20}{'pet.':>8}{'err.':>7}{'pet/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for operation, item in result['endpoints'].items():
+        print(f"  {operation:<20}{item['peticiones']:>8}{item['errores']:>7}{item['por_segundo']:>9}"
+              f"{item['p50_ms']:>10}{item['p95_ms']:>10}{item['p99_ms']:>10}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mixes = args.mezcla or [parse_mix(DEFAULT_MIX)]
+    concurrencies = [int(value) for value in args.concurrencia.split(",")]
+
+    postgres = None
+    server = None
+    try:
+        if args.dsn:
+            import psycopg2.extensions
+            db_config = psycopg2.extensions.parse_dsn(args.dsn)
+        else:
+            postgres = TemporaryPostgres(max_connections=max(100, max(concurrencies) * 4)).start()
+            db_config = postgres.db_config()
+
+        config.DB_CONFIG.clear()
+        config.DB_CONFIG.update(db_config)
+        config.DB_POOL_MAX_SIZE = max(config.DB_POOL_MAX_SIZE, max(concurrencies))
+
+        print("Cargando esquema y datos sintéticos...", file=sys.stderr)
+        seeded = seeding.prepare(config.DB_CONFIG, args.usuarios, args.mascotas, args.citas, args.pendientes)
+
+        base_url = args.url
+        if not base_url:
+            from app import create_app
+            server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f"http://127.0.0.1:{server.server_port}"
+
+        traffic = Traffic(base_url, seeded, args.usuarios)
+        results = []
+        for mix, concurrency in itertools.product(mixes, concurrencies):
+            result = run_round(traffic, mix, concurrency, args.duracion, args.calentamiento, args.semilla)
+            print_round(result)
+            results.append(result)
+
+        if args.salida:
+            with open(args.salida, "w", encoding="utf-8") as output:
+                json.dump({'fecha': time.strftime("%Y-%m-%dT%H:%M:%S"), 'rondas': results}, output,
+                          indent=2, ensure_ascii=False)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if postgres is not None:
+            postgres.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
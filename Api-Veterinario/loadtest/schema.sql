@@ -0,0 +1,81 @@
+-- Tablas que usa la API (models/user.py y services/import_service.py),
+-- para las pruebas de carga sobre un PostgreSQL desechable.
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS Usuario (
+    idUsuario SERIAL PRIMARY KEY,
+    nombre VARCHAR(100) NOT NULL,
+    contraseña TEXT NOT NULL,
+    rol VARCHAR(20) NOT NULL CHECK (rol IN ('programador', 'empleado', 'cliente'))
+);
+
+CREATE TABLE IF NOT EXISTS Cliente (
+    idCliente SERIAL PRIMARY KEY,
+    Usuario_idUsuario INTEGER NOT NULL REFERENCES Usuario(idUsuario) ON DELETE CASCADE,
+    direccion TEXT NOT NULL,
+    telefono VARCHAR(20) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Empleado (
+    idEmpleado SERIAL PRIMARY KEY,
+    Usuario_idUsuario INTEGER NOT NULL REFERENCES Usuario(idUsuario) ON DELETE CASCADE,
+    especialidad VARCHAR(100) NOT NULL,
+    nombre_completo VARCHAR(200) NOT NULL,
+    dni VARCHAR(20) NOT NULL,
+    telefono VARCHAR(20) NOT NULL,
+    direccion TEXT NOT NULL,
+    fecha_contratacion DATE NOT NULL DEFAULT CURRENT_DATE
+);
+
+CREATE TABLE IF NOT EXISTS Programador (
+    idProgramador SERIAL PRIMARY KEY,
+    Usuario_idUsuario INTEGER NOT NULL REFERENCES Usuario(idUsuario) ON DELETE CASCADE,
+    dni VARCHAR(20) NOT NULL,
+    telefono VARCHAR(20) NOT NULL,
+    direccion TEXT NOT NULL,
+    fecha_contratacion DATE NOT NULL DEFAULT CURRENT_DATE
+);
+
+CREATE TABLE IF NOT EXISTS mascota (
+    id_mascota UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    nombre VARCHAR(100) NOT NULL,
+    especie VARCHAR(50) NOT NULL,
+    raza VARCHAR(100),
+    edad INTEGER,
+    peso NUMERIC(5,2),
+    notas_especiales TEXT,
+    historial_medico TEXT,
+    imagen TEXT,
+    alergia TEXT,
+    id_usuario INTEGER NOT NULL REFERENCES Usuario(idUsuario) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS servicio (
+    id_servicio INTEGER GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    nombre_servicio VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS cita (
+    id_cita UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    fecha DATE NOT NULL,
+    hora_inicio TIME NOT NULL,
+    hora_final TIME NOT NULL,
+    is_canceled BOOLEAN NOT NULL,
+    id_servicio INTEGER NOT NULL REFERENCES servicio(id_servicio) ON DELETE SET NULL,
+    id_mascota UUID NOT NULL REFERENCES mascota(id_mascota) ON DELETE CASCADE
+    CHECK (hora_final > hora_inicio)
+);
+
+INSERT INTO servicio (nombre_servicio) VALUES
+('Consulta general'),
+('Vacunación'),
+('Desparasitación'),
+('Cirugía menor'),
+('Limpieza dental'),
+('Castración química'),
+('Análisis de sangre');
+
+CREATE INDEX IF NOT EXISTS idx_mascota_usuario ON mascota(id_usuario);
+CREATE INDEX IF NOT EXISTS idx_cita_fecha ON cita(fecha);
+CREATE INDEX IF NOT EXISTS idx_cita_mascota ON cita(id_mascota);
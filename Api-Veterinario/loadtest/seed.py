@@ -0,0 +1,105 @@
+import glob
+import os
+
+import psycopg2
+
+from utils.security import Security
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEMA = os.path.join(BASE_DIR, "loadtest", "schema.sql")
+MIGRATIONS = os.path.join(BASE_DIR, "db", "migrations")
+
+PASSWORD = "carga1234"
+ADMIN_NAME = "carga_programador"
+
+
+def load_schema(connection):
+    paths = [SCHEMA] + sorted(glob.glob(os.path.join(MIGRATIONS, "*.sql")))
+    with connection.cursor() as cursor:
+        for path in paths:
+            with open(path, encoding="utf-8") as sql_file:
+                cursor.execute(sql_file.read())
+    connection.commit()
+
+
+def seed(connection, users, pets, appointments, spare_clients):
+    # Every seeded user shares one hash: hashing N passwords would take far
+    # longer than the load test itself and measures nothing useful.
+    hashed = Security.hash_password(PASSWORD)
+    clients = max(1, users * 8 // 10)
+    employees = max(1, users - clients)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO Usuario (nombre, contraseña, rol) VALUES (%s, %s, 'programador') RETURNING idUsuario",
+            (ADMIN_NAME, hashed)
+        )
+        admin_id = cursor.fetchone()[0]
+        cursor.execute(
+            "INSERT INTO Programador (Usuario_idUsuario, dni, telefono, direccion) "
+            "VALUES (%s, '00000000T', '600000000', 'Calle Carga 1')",
+            (admin_id,)
+        )
+
+        cursor.execute("""
+            WITH nuevos AS (
+                INSERT INTO Usuario (nombre, contraseña, rol)
+                SELECT 'carga_cliente_' || g, %s, 'cliente' FROM generate_series(1, %s) g
+                RETURNING idUsuario
+            )
+            INSERT INTO Cliente (Usuario_idUsuario, direccion, telefono)
+            SELECT idUsuario, 'Calle Carga ' || idUsuario, '6' || lpad(idUsuario::text, 8, '0') FROM nuevos
+        """, (hashed, clients))
+
+        cursor.execute("""
+            WITH nuevos AS (
+                INSERT INTO Usuario (nombre, contraseña, rol)
+                SELECT 'carga_empleado_' || g, %s, 'empleado' FROM generate_series(1, %s) g
+                RETURNING idUsuario
+            )
+            INSERT INTO Empleado (Usuario_idUsuario, especialidad, nombre_completo, dni, telefono, direccion)
+            SELECT idUsuario, 'Medicina general', 'Empleado ' || idUsuario, lpad(idUsuario::text, 8, '0') || 'E',
+                   '7' || lpad(idUsuario::text, 8, '0'), 'Calle Carga ' || idUsuario
+            FROM nuevos
+        """, (hashed, employees))
+
+        # Clients without a Cliente row, consumed by /registrar_cliente.
+        cursor.execute("""
+            INSERT INTO Usuario (nombre, contraseña, rol)
+            SELECT 'carga_pendiente_' || g, %s, 'cliente' FROM generate_series(1, %s) g
+            RETURNING idUsuario, nombre, rol
+        """, (hashed, spare_clients))
+        pending = [{'idusuario': row[0], 'nombre': row[1], 'rol': row[2]} for row in cursor.fetchall()]
+
+        cursor.execute("""
+            INSERT INTO mascota (id_usuario, nombre, especie, raza, edad, peso)
+            SELECT c.Usuario_idUsuario, 'Mascota ' || g, (ARRAY['perro', 'gato', 'conejo'])[mod(g, 3) + 1],
+                   'Mestizo', mod(g, 15), mod(g, 40) + 1.5
+            FROM generate_series(1, %s) g
+            JOIN (SELECT Usuario_idUsuario, row_number() OVER (ORDER BY idCliente) AS n FROM Cliente) c
+              ON c.n = mod(g - 1, %s) + 1
+        """, (pets, clients))
+
+        cursor.execute("""
+            INSERT INTO cita (fecha, hora_inicio, hora_final, is_canceled, id_servicio, id_mascota)
+            SELECT CURRENT_DATE + mod(g, 60), TIME '09:00' + mod(g, 16) * INTERVAL '30 minutes',
+                   TIME '09:30' + mod(g, 16) * INTERVAL '30 minutes', mod(g, 20) = 0,
+                   mod(g, 7) + 1, m.id_mascota
+            FROM generate_series(1, %s) g
+            JOIN (SELECT id_mascota, row_number() OVER (ORDER BY id_mascota) AS n FROM mascota) m
+              ON m.n = mod(g - 1, %s) + 1
+        """, (appointments, max(pets, 1)))
+
+        cursor.execute("ANALYZE")
+    connection.commit()
+
+    return {'admin': {'idusuario': admin_id, 'nombre': ADMIN_NAME, 'rol': "programador"}, 'pendientes': pending}
+
+
+def prepare(db_config, users, pets, appointments, spare_clients):
+    connection = psycopg2.connect(**db_config)
+    try:
+        load_schema(connection)
+        return seed(connection, users, pets, appointments, spare_clients)
+    finally:
+        connection.close()
@@ -0,0 +1,101 @@
+import asyncio
+
+from db.async_database import AsyncDatabase
+from models.user import User
+from services.catalog_service import CatalogService
+from utils.security import Security
+
+
+class AsyncUser:
+
+    @staticmethod
+    async def get_by_id(user_id, session=None):
+        users = await (session or AsyncDatabase).select(
+            "Usuario",
+            condition="idUsuario = %s",
+            condition_params=(user_id,)
+        )
+        return users[0] if users else None
+
+    @staticmethod
+    async def get_by_name(username):
+        users = await AsyncDatabase.select(
+            "Usuario",
+            condition="nombre = %s",
+            condition_params=(username,)
+        )
+        return users[0] if users else None
+
+    @staticmethod
+    async def create(username, password, role):
+        role = User.validate_role(role, CatalogService.loaded_roles())
+
+        hashed_password = await asyncio.to_thread(Security.hash_password, password)
+
+        user_data = {
+            'nombre': username,
+            'contraseña': hashed_password,
+            'rol': role
+        }
+
+        result = await AsyncDatabase.insert("Usuario", user_data, "idUsuario", on_conflict="nombre")
+        if not result:
+            raise ValueError("El nombre de usuario ya existe")
+
+        user_id = User._returned_id(result, "idUsuario")
+        await asyncio.to_thread(User.invalidate, user_id, username)
+        return user_id
+
+    @staticmethod
+    async def create_profile(model, data):
+        async with AsyncDatabase.transaction() as session:
+            result = await session.insert_select(
+                model.table,
+                data,
+                "Usuario",
+                "idUsuario = %s AND rol = %s",
+                (data['Usuario_idUsuario'], model.role),
+                returning=model.id_column,
+                on_conflict="Usuario_idUsuario"
+            )
+            if not result:
+                User._raise_profile_error(await AsyncUser.get_by_id(data['Usuario_idUsuario'], session), model.role)
+        return User._returned_id(result, model.id_column)
+
+    @staticmethod
+    async def get_all():
+        return await AsyncDatabase.select("Usuario", "idUsuario, nombre, rol", order_by="idUsuario ASC")
+
+    @staticmethod
+    async def get_page(after_id=None, limit=100):
+        return await AsyncDatabase.select(
+            "Usuario",
+            "idUsuario, nombre, rol",
+            condition="idUsuario > %s" if after_id is not None else None,
+            condition_params=(after_id,) if after_id is not None else None,
+            order_by="idUsuario ASC",
+            limit=limit
+        )
+
+    @staticmethod
+    def stream_all(after_id=None):
+        return AsyncDatabase.select_stream(
+            "Usuario",
+            "idUsuario, nombre, rol",
+            condition="idUsuario > %s" if after_id is not None else None,
+            condition_params=(after_id,) if after_id is not None else None,
+            order_by="idUsuario ASC"
+        )
+
+    @staticmethod
+    async def update_password(user_id, new_password):
+        hashed_password = await asyncio.to_thread(Security.hash_password, new_password)
+        result = await AsyncDatabase.update(
+            "Usuario",
+            {"contraseña": hashed_password},
+            "idUsuario = %s",
+            (user_id,),
+            returning="nombre"
+        )
+        await asyncio.to_thread(User.invalidate, user_id, result[0]['nombre'] if result else None)
+        return True
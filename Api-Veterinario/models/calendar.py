@@ -0,0 +1,32 @@
+from db.database import Database
+
+COLUMNS = ("id_cita, fecha, hora_inicio, hora_final, is_canceled, id_servicio, servicio, id_mascota, mascota, "
+           "especie, id_propietario, propietario, id_empleado, empleado_asignado")
+
+
+class Calendar:
+    table = "calendario_citas"
+
+    @staticmethod
+    def get_range(start_date, end_date, employee_id=None, owner_id=None, include_canceled=False):
+        # Reads the trigger-maintained calendario_citas table; every filter
+        # combination is a range scan on one of its (…, fecha) indexes.
+        condition = "fecha BETWEEN %s AND %s"
+        params = [start_date, end_date]
+        if employee_id is not None:
+            condition = "id_empleado = %s AND " + condition
+            params.insert(0, employee_id)
+        if owner_id is not None:
+            condition = "id_propietario = %s AND " + condition
+            params.insert(0, owner_id)
+        if not include_canceled:
+            condition += " AND NOT is_canceled"
+
+        return Database.select(
+            Calendar.table,
+            COLUMNS,
+            condition=condition,
+            condition_params=params,
+            order_by="fecha ASC, hora_inicio ASC",
+            row_format="dict"
+        ) or []
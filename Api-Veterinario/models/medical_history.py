@@ -0,0 +1,67 @@
+import config
+from db.database import Database
+from models.user import User
+
+COLUMNS = "id_entrada, id_mascota, fecha, id_autor, texto"
+
+
+class MedicalHistory:
+    table = "entrada_historial"
+    id_column = "id_entrada"
+
+    @staticmethod
+    def _pet_condition(pet_id, owner_id):
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_mascota IN (SELECT id_mascota FROM mascota WHERE id_usuario = %s)"
+            params.append(owner_id)
+        return condition, params
+
+    @staticmethod
+    def validate_text(text):
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("El texto de la entrada no puede estar vacío")
+        if len(text) > config.HISTORY_ENTRY_MAX_LENGTH:
+            raise ValueError(f"El texto de la entrada no puede superar {config.HISTORY_ENTRY_MAX_LENGTH} caracteres")
+        return text.strip()
+
+    @staticmethod
+    def append(pet_id, text, author_id, owner_id=None, session=None):
+        # A single-row insert: the history never rewrites earlier entries.
+        entry = {'id_mascota': pet_id, 'id_autor': author_id, 'texto': MedicalHistory.validate_text(text)}
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        result = (session or Database).insert_select(
+            MedicalHistory.table, entry, "mascota", condition, params, returning=MedicalHistory.id_column
+        )
+        return User._returned_id(result, MedicalHistory.id_column)
+
+    @staticmethod
+    def get_page(pet_id, before_id=None, limit=20, owner_id=None):
+        # Newest first, keyset on id_entrada over idx_entrada_historial_mascota.
+        condition, params = MedicalHistory._pet_condition(pet_id, owner_id)
+        if before_id is not None:
+            condition += " AND id_entrada < %s"
+            params.append(before_id)
+
+        return Database.select(
+            MedicalHistory.table,
+            COLUMNS,
+            condition=condition,
+            condition_params=params,
+            order_by="id_entrada DESC",
+            limit=limit,
+            row_format="dict"
+        ) or []
+
+    @staticmethod
+    def stream(pet_id, owner_id=None):
+        condition, params = MedicalHistory._pet_condition(pet_id, owner_id)
+        return Database.select_stream(
+            MedicalHistory.table, COLUMNS, condition, params, order_by="id_entrada DESC"
+        )
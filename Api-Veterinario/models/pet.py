@@ -0,0 +1,193 @@
+import decimal
+
+from db.database import Database
+from models.medical_history import MedicalHistory
+from models.user import User
+
+SUMMARY_COLUMNS = "id_mascota, id_usuario, nombre, especie, raza, edad, peso, notas_especiales, imagen, alergia"
+SEARCH_COLUMNS = "id_mascota, id_usuario, nombre, especie, raza"
+# Must match idx_mascota_busqueda_trgm (db/migrations/007_busqueda_trigramas.sql).
+SEARCH_TEXT = "lower(nombre || ' ' || coalesce(raza, '') || ' ' || especie)"
+
+
+class Pet:
+    table = "mascota"
+    id_column = "id_mascota"
+    fields = ("nombre", "especie", "raza", "edad", "peso", "notas_especiales", "alergia")
+    required = ("nombre", "especie")
+
+    @staticmethod
+    def build_data(data, partial=False):
+        pet_data = {field: data[field] for field in Pet.fields if field in data}
+
+        if not partial:
+            missing = [field for field in Pet.required if not pet_data.get(field)]
+            if missing:
+                raise ValueError(f"Campos obligatorios faltantes: {', '.join(missing)}")
+        elif not pet_data:
+            raise ValueError("No se han proporcionado campos para actualizar")
+
+        for field in Pet.required:
+            if field in pet_data and not pet_data[field]:
+                raise ValueError(f"El campo {field} no puede estar vacío")
+
+        if pet_data.get('edad') is not None:
+            if isinstance(pet_data['edad'], bool) or not isinstance(pet_data['edad'], int) or pet_data['edad'] < 0:
+                raise ValueError("La edad debe ser un número entero no negativo")
+
+        if pet_data.get('peso') is not None:
+            try:
+                peso = decimal.Decimal(str(pet_data['peso']))
+            except decimal.InvalidOperation:
+                raise ValueError("El peso debe ser un número")
+            if not peso.is_finite() or peso < 0 or peso >= 1000:
+                raise ValueError("El peso debe estar entre 0 y 999.99")
+            pet_data['peso'] = peso
+
+        return pet_data
+
+    @staticmethod
+    def get_by_id(pet_id, owner_id=None):
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        pets = Database.select(Pet.table, SUMMARY_COLUMNS, condition, params, row_format="dict")
+        return pets[0] if pets else None
+
+    @staticmethod
+    def get_page(owner_id, after_id=None, limit=50):
+        # Keyset pagination over (id_usuario, id_mascota), served by the
+        # composite owner index.
+        condition = "id_usuario = %s"
+        params = [owner_id]
+        if after_id is not None:
+            condition += " AND id_mascota > %s"
+            params.append(after_id)
+
+        return Database.select(
+            Pet.table,
+            SUMMARY_COLUMNS,
+            condition=condition,
+            condition_params=params,
+            order_by="id_mascota ASC",
+            limit=limit,
+            row_format="dict"
+        ) or []
+
+    @staticmethod
+    def get_by_owners(owner_ids):
+        # One query for every owner instead of one per owner.
+        owner_ids = sorted(set(owner_ids))
+        pets_by_owner = {owner_id: [] for owner_id in owner_ids}
+        if not owner_ids:
+            return pets_by_owner
+
+        pets = Database.select(
+            Pet.table,
+            SUMMARY_COLUMNS,
+            condition="id_usuario = ANY(%s)",
+            condition_params=(owner_ids,),
+            order_by="id_usuario ASC, id_mascota ASC",
+            row_format="dict"
+        ) or []
+        for pet in pets:
+            pets_by_owner[pet['id_usuario']].append(pet)
+        return pets_by_owner
+
+    @staticmethod
+    def search(term, limit, owner_id=None):
+        escaped = Database.escape_like(term)
+        condition = f"({SEARCH_TEXT} LIKE %s OR %s <%% {SEARCH_TEXT})"
+        params = [term, f"%{escaped}%", term]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+        params += [f"{escaped}%", limit]
+
+        query = (
+            f"SELECT {SEARCH_COLUMNS}, word_similarity(%s, {SEARCH_TEXT}) AS puntuacion"
+            f" FROM {Pet.table} WHERE {condition}"
+            " ORDER BY lower(nombre) LIKE %s DESC, puntuacion DESC, id_mascota ASC"
+            " LIMIT %s"
+        )
+        return Database.execute_query(query, params, row_format="dict") or []
+
+    @staticmethod
+    def autocomplete(prefix, limit, owner_id=None):
+        condition = "lower(nombre) LIKE %s"
+        params = [f"{Database.escape_like(prefix)}%"]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        return Database.select(
+            Pet.table,
+            SEARCH_COLUMNS,
+            condition=condition,
+            condition_params=params,
+            order_by="lower(nombre) ASC, id_mascota ASC",
+            limit=limit,
+            row_format="dict"
+        ) or []
+
+    @staticmethod
+    def create(owner_id, data, history=None, author_id=None):
+        pet_data = Pet.build_data(data)
+        pet_data['id_usuario'] = owner_id
+        if history:
+            MedicalHistory.validate_text(history)
+
+        # The owner must exist and be a client; checked in the same statement.
+        # The first history entry commits or rolls back with the pet.
+        with Database.transaction() as session:
+            result = session.insert_select(
+                Pet.table,
+                pet_data,
+                "Usuario",
+                "idUsuario = %s AND rol = 'cliente'",
+                (owner_id,),
+                returning=Pet.id_column
+            )
+            if not result:
+                raise ValueError("El propietario no existe o no tiene rol de cliente")
+            pet_id = User._returned_id(result, Pet.id_column)
+            if history:
+                MedicalHistory.append(pet_id, history, author_id, session=session)
+        return pet_id
+
+    @staticmethod
+    def update(pet_id, data, owner_id=None):
+        pet_data = Pet.build_data(data, partial=True)
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        result = Database.update(Pet.table, pet_data, condition, params, returning=Pet.id_column)
+        return bool(result)
+
+    @staticmethod
+    def set_image(pet_id, image_hash, owner_id=None):
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        result = Database.update(Pet.table, {'imagen': image_hash}, condition, params, returning=Pet.id_column)
+        return bool(result)
+
+    @staticmethod
+    def delete(pet_id, owner_id=None):
+        condition = "id_mascota = %s"
+        params = [pet_id]
+        if owner_id is not None:
+            condition += " AND id_usuario = %s"
+            params.append(owner_id)
+
+        result = Database.delete(Pet.table, condition, params, returning=Pet.id_column)
+        return bool(result)
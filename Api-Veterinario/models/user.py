@@ -1,44 +1,158 @@
+import config
 from db.database import Database
+from services.catalog_service import CatalogService
+from utils.cache import create_cache
 from utils.security import Security
 
 class User:
+    _cache = None
+    _cache_ready = False
 
     @staticmethod
-    def get_by_id(user_id):
-        print(f"Buscando usuario con ID: {user_id}, tipo: {type(user_id)}")
-        users = Database.select(
-            "Usuario",
-            condition="idUsuario = %s",
-            condition_params=(user_id,)
-        )
-        if not users:
-            print("No se encontró usuario con 'idUsuario', intentando con 'idusuario'")
-            users = Database.select(
+    def get_cache():
+        if not User._cache_ready:
+            User._cache = create_cache(
+                config.USER_CACHE_BACKEND,
+                "usuario",
+                max_size=config.USER_CACHE_SIZE,
+                ttl=config.USER_CACHE_TTL,
+                redis_url=config.REDIS_URL
+            )
+            User._cache_ready = True
+        return User._cache
+
+    @staticmethod
+    def cache_stats():
+        cache = User.get_cache()
+        if cache is None:
+            return {'backend': 'none'}
+        stats = cache.stats()
+        stats['backend'] = config.USER_CACHE_BACKEND
+        return stats
+
+    @staticmethod
+    def _id_key(user_id):
+        # Route parameters arrive as strings and token ids as ints; both
+        # must map to the same entry or invalidations miss it.
+        try:
+            return f"id:{int(user_id)}"
+        except (TypeError, ValueError):
+            return f"id:{user_id}"
+
+    @staticmethod
+    def invalidate(user_id=None, username=None):
+        cache = User.get_cache()
+        if cache is None:
+            return
+        if user_id is not None:
+            cache.delete(User._id_key(user_id))
+        if username is not None:
+            cache.delete(f"nombre:{username}")
+
+    @staticmethod
+    def _without_password(user):
+        if user is None:
+            return None
+        return {column: value for column, value in user.items() if column != 'contraseña'}
+
+    @staticmethod
+    def _cached(key, load):
+        # The password hash never enters the cache: it would be copied to
+        # Redis, and other workers would keep accepting an old password
+        # until the entry expired. Login reads it with get_credentials.
+        cache = User.get_cache()
+        if cache is None:
+            return User._without_password(load())
+
+        user = cache.get(key)
+        if user is None:
+            user = User._without_password(load())
+            if user is not None:
+                cache.set(key, user)
+        return user
+
+    @staticmethod
+    def get_by_id(user_id, session=None, for_update=False):
+        def load():
+            # PostgreSQL folds unquoted identifiers, so idUsuario and idusuario
+            # are the same column and a single lookup is enough.
+            users = (session or Database).select(
                 "Usuario",
-                condition="idusuario = %s",
-                condition_params=(user_id,)
+                condition="idUsuario = %s",
+                condition_params=(user_id,),
+                for_update=for_update,
+                row_format="dict"
             )
-        return users[0] if users else None
+            return users[0] if users else None
+
+        # Lookups inside a transaction must see (and lock) the live row.
+        if session is not None:
+            return load()
+        return User._cached(User._id_key(user_id), load)
 
     @staticmethod
     def get_by_name(username):
+        def load():
+            users = Database.select(
+                "Usuario",
+                condition="nombre = %s",
+                condition_params=(username,),
+                row_format="dict"
+            )
+            return users[0] if users else None
+
+        return User._cached(f"nombre:{username}", load)
+
+    @staticmethod
+    def get_credentials(username):
         users = Database.select(
             "Usuario",
             condition="nombre = %s",
-            condition_params=(username,)
+            condition_params=(username,),
+            row_format="dict"
         )
         return users[0] if users else None
 
     @staticmethod
-    def create(username, password, role):
+    def search(term, limit):
+        # Substring or fuzzy match on the trigram index; exact prefixes
+        # rank first, then by how well the term matches a word of the name.
+        query = (
+            "SELECT idUsuario, nombre, rol, word_similarity(%s, lower(nombre)) AS puntuacion"
+            " FROM Usuario"
+            " WHERE lower(nombre) LIKE %s OR %s <%% lower(nombre)"
+            " ORDER BY lower(nombre) LIKE %s DESC, puntuacion DESC, idUsuario ASC"
+            " LIMIT %s"
+        )
+        escaped = Database.escape_like(term)
+        params = (term, f"%{escaped}%", term, f"{escaped}%", limit)
+        return Database.execute_query(query, params, row_format="dict") or []
+
+    @staticmethod
+    def autocomplete(prefix, limit):
+        return Database.select(
+            "Usuario",
+            "idUsuario, nombre, rol",
+            condition="lower(nombre) LIKE %s",
+            condition_params=(f"{Database.escape_like(prefix)}%",),
+            order_by="lower(nombre) ASC, idUsuario ASC",
+            limit=limit,
+            row_format="dict"
+        ) or []
+
+    @staticmethod
+    def validate_role(role, valid_roles=None):
         role = role.lower() if role else role
 
-        valid_roles = ['programador', 'empleado', 'cliente']
+        if valid_roles is None:
+            valid_roles = CatalogService.roles()
         if role not in valid_roles:
-            raise ValueError(f"Rol no válido. Debe ser uno de: {', '.join(valid_roles)}")
+            raise ValueError(f"Rol no válido. Debe ser uno de: {', '.join(sorted(valid_roles))}")
+        return role
 
-        if User.get_by_name(username):
-            raise ValueError("El nombre de usuario ya existe")
+    @staticmethod
+    def create(username, password, role):
+        role = User.validate_role(role)
 
         hashed_password = Security.hash_password(password)
 
@@ -48,32 +162,101 @@ class User:
             'rol': role
         }
 
-        result = Database.insert("Usuario", user_data, "idUsuario")
-        if result and len(result) > 0:
-            if isinstance(result[0], dict) and 'idusuario' in result[0]:
-                return result[0]['idusuario']
-            elif isinstance(result[0], dict) and 'idUsuario' in result[0]:
-                return result[0]['idUsuario']
-            elif isinstance(result[0], dict):
-                return list(result[0].values())[0] if result[0] else None
-            else:
-                return result[0]
-        return None
+        result = Database.insert("Usuario", user_data, "idUsuario", on_conflict="nombre")
+        if not result:
+            raise ValueError("El nombre de usuario ya existe")
+
+        user_id = User._returned_id(result, "idUsuario")
+        User.invalidate(user_id, username)
+        return user_id
+
+    @staticmethod
+    def _returned_id(result, column):
+        if not result:
+            return None
+        row = result[0]
+        if isinstance(row, dict):
+            return row.get(column.lower(), next(iter(row.values()), None))
+        return row[0]
+
+    @staticmethod
+    def _create_profile(table, id_column, role, data):
+        # Role check, duplicate check and insert are one statement; the
+        # follow-up lookup only runs to explain a rejected registration.
+        with Database.transaction() as session:
+            result = session.insert_select(
+                table,
+                data,
+                "Usuario",
+                "idUsuario = %s AND rol = %s",
+                (data['Usuario_idUsuario'], role),
+                returning=id_column,
+                on_conflict="Usuario_idUsuario"
+            )
+            if not result:
+                User._raise_profile_error(User.get_by_id(data['Usuario_idUsuario'], session), role)
+        return User._returned_id(result, id_column)
+
+    @staticmethod
+    def _raise_profile_error(user, role):
+        if not user:
+            raise ValueError("Usuario no encontrado")
+        if user['rol'] != role:
+            raise ValueError(f"El usuario no tiene rol de {role}")
+        raise ValueError(f"Este usuario ya tiene un registro de {role}")
 
     @staticmethod
     def update_password(user_id, new_password):
         hashed_password = Security.hash_password(new_password)
-        Database.update(
+        result = Database.update(
             "Usuario",
             {"contraseña": hashed_password},
             "idUsuario = %s",
-            (user_id,)
+            (user_id,),
+            returning="nombre"
         )
+        User.invalidate(user_id, result[0]['nombre'] if result else None)
+        return True
+
+    @staticmethod
+    def set_image(user_id, image_hash):
+        result = Database.update(
+            "Usuario",
+            {"imagen": image_hash},
+            "idUsuario = %s",
+            (user_id,),
+            returning="nombre"
+        )
+        if not result:
+            return False
+        User.invalidate(user_id, result[0]['nombre'])
         return True
 
     @staticmethod
     def get_all():
-        return Database.select("Usuario", "idUsuario, nombre, rol", order_by="idUsuario ASC")
+        return Database.select("Usuario", "idUsuario, nombre, rol", order_by="idUsuario ASC", row_format="dict")
+
+    @staticmethod
+    def get_page(after_id=None, limit=100):
+        return Database.select(
+            "Usuario",
+            "idUsuario, nombre, rol",
+            condition="idUsuario > %s" if after_id is not None else None,
+            condition_params=(after_id,) if after_id is not None else None,
+            order_by="idUsuario ASC",
+            limit=limit,
+            row_format="dict"
+        )
+
+    @staticmethod
+    def stream_all(after_id=None):
+        return Database.select_stream(
+            "Usuario",
+            "idUsuario, nombre, rol",
+            condition="idUsuario > %s" if after_id is not None else None,
+            condition_params=(after_id,) if after_id is not None else None,
+            order_by="idUsuario ASC"
+        )
 
     @staticmethod
     def verify_password(user_id, password):
@@ -91,66 +274,31 @@ class User:
 
 
 class Client(User):
+    table = "Cliente"
+    id_column = "idCliente"
+    role = "cliente"
 
     @staticmethod
-    def create(user_id, address, phone):
-        user = User.get_by_id(user_id)
-        if not user:
-            raise ValueError("Usuario no encontrado")
-
-        if user['rol'] != 'cliente':
-            raise ValueError("El usuario no tiene rol de cliente")
-
-        clients = Database.select(
-            "Cliente",
-            "idCliente",
-            condition="Usuario_idUsuario = %s",
-            condition_params=(user_id,)
-        )
-
-        if clients:
-            raise ValueError("Este usuario ya tiene un registro de cliente")
-
-        client_data = {
+    def build_data(user_id, address, phone):
+        return {
             'Usuario_idUsuario': user_id,
             'direccion': address,
             'telefono': phone
         }
 
-        result = Database.insert("Cliente", client_data, "idCliente")
-        if result and len(result) > 0:
-            if isinstance(result[0], dict) and 'idcliente' in result[0]:
-                return result[0]['idcliente']
-            elif isinstance(result[0], dict) and 'idCliente' in result[0]:
-                return result[0]['idCliente']
-            elif isinstance(result[0], dict):
-                return list(result[0].values())[0] if result[0] else None
-            else:
-                return result[0]
-        return None
+    @staticmethod
+    def create(user_id, address, phone):
+        client_data = Client.build_data(user_id, address, phone)
+        return User._create_profile(Client.table, Client.id_column, Client.role, client_data)
 
 
 class Employee(User):
+    table = "Empleado"
+    id_column = "idEmpleado"
+    role = "empleado"
 
     @staticmethod
-    def create(user_id, specialty, full_name, dni, phone, address, hire_date=None):
-        user = User.get_by_id(user_id)
-        if not user:
-            raise ValueError("Usuario no encontrado")
-
-        if user['rol'] != 'empleado':
-            raise ValueError("El usuario no tiene rol de empleado")
-
-        employees = Database.select(
-            "Empleado",
-            "idEmpleado",
-            condition="Usuario_idUsuario = %s",
-            condition_params=(user_id,)
-        )
-
-        if employees:
-            raise ValueError("Este usuario ya tiene un registro de empleado")
-
+    def build_data(user_id, specialty, full_name, dni, phone, address, hire_date=None):
         employee_data = {
             'Usuario_idUsuario': user_id,
             'especialidad': specialty,
@@ -162,41 +310,21 @@ class Employee(User):
 
         if hire_date:
             employee_data['fecha_contratacion'] = hire_date
+        return employee_data
 
-        result = Database.insert("Empleado", employee_data, "idEmpleado")
-        if result and len(result) > 0:
-            if isinstance(result[0], dict) and 'idempleado' in result[0]:
-                return result[0]['idempleado']
-            elif isinstance(result[0], dict) and 'idEmpleado' in result[0]:
-                return result[0]['idEmpleado']
-            elif isinstance(result[0], dict):
-                return list(result[0].values())[0] if result[0] else None
-            else:
-                return result[0]
-        return None
+    @staticmethod
+    def create(user_id, specialty, full_name, dni, phone, address, hire_date=None):
+        employee_data = Employee.build_data(user_id, specialty, full_name, dni, phone, address, hire_date)
+        return User._create_profile(Employee.table, Employee.id_column, Employee.role, employee_data)
 
 
 class Programmer(User):
+    table = "Programador"
+    id_column = "idProgramador"
+    role = "programador"
 
     @staticmethod
-    def create(user_id, dni, phone, address, hire_date=None):
-        user = User.get_by_id(user_id)
-        if not user:
-            raise ValueError("Usuario no encontrado")
-
-        if user['rol'] != 'programador':
-            raise ValueError("El usuario no tiene rol de programador")
-
-        programmers = Database.select(
-            "Programador",
-            "idProgramador",
-            condition="Usuario_idUsuario = %s",
-            condition_params=(user_id,)
-        )
-
-        if programmers:
-            raise ValueError("Este usuario ya tiene un registro de programador")
-
+    def build_data(user_id, dni, phone, address, hire_date=None):
         programmer_data = {
             'Usuario_idUsuario': user_id,
             'dni': dni,
@@ -206,15 +334,9 @@ class Programmer(User):
 
         if hire_date:
             programmer_data['fecha_contratacion'] = hire_date
+        return programmer_data
 
-        result = Database.insert("Programador", programmer_data, "idProgramador")
-        if result and len(result) > 0:
-            if isinstance(result[0], dict) and 'idprogramador' in result[0]:
-                return result[0]['idprogramador']
-            elif isinstance(result[0], dict) and 'idProgramador' in result[0]:
-                return result[0]['idProgramador']
-            elif isinstance(result[0], dict):
-                return list(result[0].values())[0] if result[0] else None
-            else:
-                return result[0]
-        return None
\ No newline at end of file
+    @staticmethod
+    def create(user_id, dni, phone, address, hire_date=None):
+        programmer_data = Programmer.build_data(user_id, dni, phone, address, hire_date)
+        return User._create_profile(Programmer.table, Programmer.id_column, Programmer.role, programmer_data)
@@ -0,0 +1,77 @@
+import hmac
+
+from flask import Blueprint, Response, request
+import config
+from db.database import Database
+from models.user import User
+from services.catalog_service import CatalogService
+from services.image_service import ImageService
+from services.scheduling_service import SchedulingService
+from services.search_service import SearchService
+from utils.response import APIResponse
+from utils.security import Security
+from utils import metrics
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/estadisticas_bd', methods=['GET'])
+@Security.token_required
+@Security.role_required('programador')
+def get_db_stats(usuario_actual):
+    try:
+        return APIResponse.success({
+            "pool": Database.pool_stats(),
+            "sentencias": Database.statement_stats(),
+            "tokens": Security.token_cache_stats(),
+            "usuarios": User.cache_stats(),
+            "consultas_lentas": Database.slow_query_stats(),
+            "agenda": SchedulingService.stats(),
+            "catalogo": CatalogService.stats(),
+            "busqueda": SearchService.stats(),
+            "imagenes": ImageService.stats()
+        })
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@admin_bp.route('/consultas_lentas', methods=['GET'])
+@Security.token_required
+@Security.role_required('programador')
+def get_slow_queries(usuario_actual):
+    try:
+        return APIResponse.success(Database.slow_queries())
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@admin_bp.route('/imagenes/limpiar', methods=['POST'])
+@Security.token_required
+@Security.role_required('programador')
+def sweep_images(usuario_actual):
+    try:
+        return APIResponse.success(ImageService.sweep(), "Limpieza de imágenes completada")
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+def _render_metrics():
+    return Response(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@Security.token_required
+@Security.role_required('programador')
+def _get_metrics_as_programmer(usuario_actual):
+    return _render_metrics()
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not config.METRICS_ENABLED:
+        return APIResponse.error("Métricas desactivadas", 404)
+    # Scrapers cannot log in, so they present METRICS_TOKEN instead of a
+    # session; everyone else needs the same role as /estadisticas_bd.
+    authorization = request.headers.get('Authorization', '').encode('utf-8')
+    if config.METRICS_TOKEN and hmac.compare_digest(authorization, f"Bearer {config.METRICS_TOKEN}".encode('utf-8')):
+        return _render_metrics()
+    return _get_metrics_as_programmer()
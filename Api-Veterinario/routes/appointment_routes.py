@@ -0,0 +1,170 @@
+import datetime
+import uuid
+
+from flask import Blueprint, request
+import config
+from models.calendar import Calendar
+from services.scheduling_service import SchedulingService, SlotUnavailableError
+from utils.response import APIResponse
+from utils.security import Security
+
+appointment_bp = Blueprint('appointment', __name__)
+
+STAFF_ROLES = ('empleado', 'programador')
+
+
+def _owner_scope(usuario_actual):
+    if usuario_actual['rol'] in STAFF_ROLES:
+        return None
+    return usuario_actual['id']
+
+
+def _date_range():
+    start_date = request.args.get("desde")
+    end_date = request.args.get("hasta")
+    start_date = datetime.date.fromisoformat(start_date) if start_date else datetime.date.today()
+    end_date = datetime.date.fromisoformat(end_date) if end_date else start_date + datetime.timedelta(days=6)
+
+    if end_date < start_date:
+        raise ValueError("La fecha final no puede ser anterior a la inicial")
+    if (end_date - start_date).days >= config.CALENDAR_MAX_DAYS:
+        raise ValueError(f"El rango no puede superar {config.CALENDAR_MAX_DAYS} días")
+    return start_date, end_date
+
+
+def _calendar_response(employee_id=None, owner_id=None):
+    try:
+        start_date, end_date = _date_range()
+    except ValueError as e:
+        return APIResponse.error(str(e))
+
+    include_canceled = request.args.get("canceladas", "false").lower() in ("1", "true")
+    appointments = Calendar.get_range(start_date, end_date, employee_id, owner_id, include_canceled)
+    return APIResponse.success({
+        "data": appointments,
+        "desde": start_date,
+        "hasta": end_date
+    })
+
+
+@appointment_bp.route('/citas/calendario', methods=['GET'])
+@Security.token_required
+@Security.role_required(*STAFF_ROLES)
+@APIResponse.conditional("calendario_citas")
+def get_clinic_calendar(usuario_actual):
+    try:
+        return _calendar_response()
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@appointment_bp.route('/citas/calendario/empleado/<int:id_empleado>', methods=['GET'])
+@Security.token_required
+@Security.role_required(*STAFF_ROLES)
+@APIResponse.conditional("calendario_citas")
+def get_employee_calendar(usuario_actual, id_empleado):
+    try:
+        return _calendar_response(employee_id=id_empleado)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@appointment_bp.route('/citas/calendario/propietario/<int:id_usuario>', methods=['GET'])
+@Security.token_required
+@APIResponse.conditional("calendario_citas")
+def get_owner_calendar(usuario_actual, id_usuario):
+    try:
+        if usuario_actual['rol'] not in STAFF_ROLES and usuario_actual['id'] != id_usuario:
+            return APIResponse.forbidden()
+        return _calendar_response(owner_id=id_usuario)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@appointment_bp.route('/citas/disponibilidad', methods=['GET'])
+@Security.token_required
+def get_availability(usuario_actual):
+    try:
+        service_id = request.args.get("id_servicio", type=int)
+        if service_id is None:
+            return APIResponse.missing_fields(["id_servicio"])
+
+        employee_id = request.args.get("id_empleado", type=int)
+        if employee_id is None and request.args.get("id_empleado"):
+            return APIResponse.error("id_empleado debe ser un número entero")
+        count = request.args.get("cantidad", 10, type=int)
+        count = max(1, min(count, config.APPOINTMENT_MAX_SLOTS))
+
+        start_date = request.args.get("desde")
+        try:
+            start_date = datetime.date.fromisoformat(start_date) if start_date else None
+        except ValueError:
+            return APIResponse.error("La fecha debe tener el formato AAAA-MM-DD")
+
+        try:
+            slots = SchedulingService.free_slots(service_id, employee_id, start_date, count)
+        except ValueError as e:
+            return APIResponse.error(str(e), 404)
+
+        return APIResponse.success({"data": slots})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@appointment_bp.route('/citas', methods=['POST'])
+@Security.token_required
+def book_appointment(usuario_actual):
+    try:
+        body_request = request.json
+        if not body_request:
+            return APIResponse.error("Datos no proporcionados")
+
+        required_fields = {
+            "id_mascota": body_request.get("id_mascota"),
+            "id_servicio": body_request.get("id_servicio"),
+            "id_empleado": body_request.get("id_empleado"),
+            "fecha": body_request.get("fecha"),
+            "hora_inicio": body_request.get("hora_inicio")
+        }
+
+        missing = [field for field, value in required_fields.items() if not value]
+        if missing:
+            return APIResponse.missing_fields(missing)
+
+        try:
+            pet_id = str(uuid.UUID(str(required_fields["id_mascota"])))
+            date = datetime.date.fromisoformat(required_fields["fecha"])
+            start_time = datetime.time.fromisoformat(required_fields["hora_inicio"])
+            service_id = int(required_fields["id_servicio"])
+            employee_id = int(required_fields["id_empleado"])
+        except (TypeError, ValueError):
+            return APIResponse.error("Formato de datos no válido")
+
+        try:
+            appointment_id = SchedulingService.book(
+                pet_id, service_id, employee_id, date, start_time, _owner_scope(usuario_actual)
+            )
+            return APIResponse.success({
+                "id_cita": appointment_id,
+                "id_empleado": employee_id,
+                "fecha": date,
+                "hora_inicio": start_time
+            }, "Cita reservada exitosamente", 201)
+        except SlotUnavailableError as e:
+            return APIResponse.conflict(str(e))
+        except ValueError as e:
+            return APIResponse.error(str(e))
+
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@appointment_bp.route('/citas/<uuid:id_cita>/cancelar', methods=['POST'])
+@Security.token_required
+def cancel_appointment(usuario_actual, id_cita):
+    try:
+        if not SchedulingService.cancel(str(id_cita), _owner_scope(usuario_actual)):
+            return APIResponse.error("Cita no encontrada o ya cancelada", 404)
+        return APIResponse.success({"id_cita": str(id_cita)}, "Cita cancelada exitosamente")
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
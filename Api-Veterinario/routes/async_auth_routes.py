@@ -0,0 +1,64 @@
+from quart import Blueprint, request
+from services.async_auth_service import AsyncAuthService
+from utils.async_response import AsyncAPIResponse
+from utils.hashing import HashingUnavailableError
+
+async_auth_bp = Blueprint('auth', __name__)
+
+
+@async_auth_bp.route('/login', methods=['POST'])
+async def login():
+    try:
+        body_request = await request.get_json(silent=True)
+        if not body_request:
+            return AsyncAPIResponse.error("Datos no proporcionados")
+
+        username = body_request.get("nombre")
+        password = body_request.get("contraseña")
+
+        if not username or not password:
+            return AsyncAPIResponse.error("Nombre de usuario y contraseña requeridos")
+
+        result, message = await AsyncAuthService.login(username, password)
+
+        if not result:
+            return AsyncAPIResponse.unauthorized(message)
+
+        return AsyncAPIResponse.success(result, message)
+
+    except HashingUnavailableError as e:
+        return AsyncAPIResponse.error(str(e), 503)
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
+
+
+@async_auth_bp.route('/registrar', methods=['POST'])
+async def register():
+    try:
+        body_request = await request.get_json(silent=True)
+        if not body_request:
+            return AsyncAPIResponse.error("Datos no proporcionados")
+
+        username = body_request.get("nombre")
+        password = body_request.get("contraseña")
+        role = body_request.get("rol")
+
+        if not username or not password or not role:
+            missing = []
+            if not username: missing.append("nombre")
+            if not password: missing.append("contraseña")
+            if not role: missing.append("rol")
+            return AsyncAPIResponse.missing_fields(missing)
+
+        result, message = await AsyncAuthService.register(username, password, role)
+
+        if not result:
+            return AsyncAPIResponse.error(message)
+
+        result["siguiente_paso"] = f"Complete el registro específico según el rol: {role}"
+        return AsyncAPIResponse.success(result, message, 201)
+
+    except HashingUnavailableError as e:
+        return AsyncAPIResponse.error(str(e), 503)
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
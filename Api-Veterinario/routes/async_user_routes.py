@@ -0,0 +1,192 @@
+import datetime
+
+from quart import Blueprint, request
+import config
+from models.async_user import AsyncUser
+from models.user import Client, Employee, Programmer
+from utils.async_response import AsyncAPIResponse
+from utils.async_security import AsyncSecurity
+
+async_user_bp = Blueprint('user', __name__)
+
+
+def _parse_profile_fields(user_id, hire_date=None):
+    # asyncpg does not coerce strings the way psycopg2 does, so JSON
+    # values are converted here and rejected with a 400 if malformed.
+    if isinstance(user_id, bool):
+        raise ValueError("usuario_id debe ser un número entero")
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        raise ValueError("usuario_id debe ser un número entero")
+
+    if hire_date:
+        try:
+            hire_date = datetime.date.fromisoformat(hire_date)
+        except (TypeError, ValueError):
+            raise ValueError("fecha_contratacion debe tener el formato AAAA-MM-DD")
+    return user_id, hire_date or None
+
+
+@async_user_bp.route('/obtener_usuarios', methods=['GET'])
+@AsyncSecurity.token_required
+@AsyncSecurity.role_required('programador')
+async def get_users(usuario_actual):
+    try:
+        after_id = request.args.get("after_id", type=int)
+        stream = request.args.get("stream")
+
+        if stream:
+            if stream not in ("json", "ndjson"):
+                return AsyncAPIResponse.error("Formato de streaming no válido. Debe ser json o ndjson")
+            return AsyncAPIResponse.stream(AsyncUser.stream_all(after_id), stream)
+
+        # Without paging parameters the endpoint keeps its original contract.
+        if after_id is None and "limit" not in request.args:
+            return AsyncAPIResponse.success(await AsyncUser.get_all())
+
+        limit = request.args.get("limit", config.USERS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, config.USERS_PAGE_MAX))
+
+        users = await AsyncUser.get_page(after_id, limit)
+        next_after_id = users[-1]['idusuario'] if users and len(users) == limit else None
+        return AsyncAPIResponse.success({
+            "data": users or [],
+            "siguiente_after_id": next_after_id
+        })
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
+
+
+@async_user_bp.route('/registrar_cliente', methods=['POST'])
+@AsyncSecurity.token_required
+async def register_client(usuario_actual):
+    try:
+        body_request = await request.get_json(silent=True)
+        if not body_request:
+            return AsyncAPIResponse.error("Datos no proporcionados")
+
+        user_id = body_request.get("usuario_id") or usuario_actual['id']
+        address = body_request.get("direccion")
+        phone = body_request.get("telefono")
+
+        if not address or not phone:
+            missing = []
+            if not address: missing.append("direccion")
+            if not phone: missing.append("telefono")
+            return AsyncAPIResponse.missing_fields(missing)
+
+        try:
+            user_id, _ = _parse_profile_fields(user_id)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+        try:
+            client_id = await AsyncUser.create_profile(Client, Client.build_data(user_id, address, phone))
+            return AsyncAPIResponse.success({
+                "id_cliente": client_id,
+                "id_usuario": user_id
+            }, "Cliente registrado exitosamente", 201)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
+
+
+@async_user_bp.route('/registrar_empleado', methods=['POST'])
+@AsyncSecurity.token_required
+@AsyncSecurity.role_required('programador')
+async def register_employee(usuario_actual):
+    try:
+        body_request = await request.get_json(silent=True)
+        if not body_request:
+            return AsyncAPIResponse.error("Datos no proporcionados")
+
+        user_id = body_request.get("usuario_id")
+        specialty = body_request.get("especialidad")
+        full_name = body_request.get("nombre_completo")
+        dni = body_request.get("dni")
+        phone = body_request.get("telefono")
+        address = body_request.get("direccion")
+        hire_date = body_request.get("fecha_contratacion")
+
+        required_fields = {
+            "usuario_id": user_id,
+            "especialidad": specialty,
+            "nombre_completo": full_name,
+            "dni": dni,
+            "telefono": phone,
+            "direccion": address
+        }
+
+        missing = [field for field, value in required_fields.items() if not value]
+        if missing:
+            return AsyncAPIResponse.missing_fields(missing)
+
+        try:
+            user_id, hire_date = _parse_profile_fields(user_id, hire_date)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+        try:
+            employee_id = await AsyncUser.create_profile(
+                Employee,
+                Employee.build_data(user_id, specialty, full_name, dni, phone, address, hire_date)
+            )
+            return AsyncAPIResponse.success({
+                "id_empleado": employee_id,
+                "id_usuario": user_id
+            }, "Empleado registrado exitosamente", 201)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
+
+
+@async_user_bp.route('/registrar_programador', methods=['POST'])
+@AsyncSecurity.token_required
+@AsyncSecurity.role_required('programador')
+async def register_programmer(usuario_actual):
+    try:
+        body_request = await request.get_json(silent=True)
+        if not body_request:
+            return AsyncAPIResponse.error("Datos no proporcionados")
+
+        user_id = body_request.get("usuario_id")
+        dni = body_request.get("dni")
+        phone = body_request.get("telefono")
+        address = body_request.get("direccion")
+        hire_date = body_request.get("fecha_contratacion")
+
+        required_fields = {
+            "usuario_id": user_id,
+            "dni": dni,
+            "telefono": phone,
+            "direccion": address
+        }
+
+        missing = [field for field, value in required_fields.items() if not value]
+        if missing:
+            return AsyncAPIResponse.missing_fields(missing)
+
+        try:
+            user_id, hire_date = _parse_profile_fields(user_id, hire_date)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+        try:
+            programmer_id = await AsyncUser.create_profile(
+                Programmer,
+                Programmer.build_data(user_id, dni, phone, address, hire_date)
+            )
+            return AsyncAPIResponse.success({
+                "id_programador": programmer_id,
+                "id_usuario": user_id
+            }, "Programador registrado exitosamente", 201)
+        except ValueError as e:
+            return AsyncAPIResponse.error(str(e))
+
+    except Exception as e:
+        return AsyncAPIResponse.error(str(e), 500)
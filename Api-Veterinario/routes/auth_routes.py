@@ -1,5 +1,7 @@
 from flask import Blueprint, request
+import config
 from services.auth_service import AuthService
+from utils.hashing import HashingUnavailableError
 from utils.response import APIResponse
 from utils.security import Security
 
@@ -26,6 +28,8 @@ def login():
 
         return APIResponse.success(result, message)
 
+    except HashingUnavailableError as e:
+        return APIResponse.error(str(e), 503)
     except Exception as e:
         return APIResponse.error(str(e), 500)
 
@@ -56,5 +60,38 @@ def register():
         result["siguiente_paso"] = f"Complete el registro específico según el rol: {role}"
         return APIResponse.success(result, message, 201)
 
+    except HashingUnavailableError as e:
+        return APIResponse.error(str(e), 503)
     except Exception as e:
-        return APIResponse.error(str(e), 500)
\ No newline at end of file
+        return APIResponse.error(str(e), 500)
+
+
+@auth_bp.route('/registrar_lote', methods=['POST'])
+@Security.token_required
+@Security.role_required('programador')
+def register_batch(usuario_actual):
+    try:
+        body_request = request.json
+        if not body_request:
+            return APIResponse.error("Datos no proporcionados")
+
+        users = body_request.get("usuarios")
+        if not isinstance(users, list) or not users:
+            return APIResponse.missing_fields(["usuarios"])
+
+        if len(users) > config.BATCH_REGISTER_MAX:
+            return APIResponse.error(f"El lote no puede superar {config.BATCH_REGISTER_MAX} usuarios")
+
+        results = AuthService.register_batch(users)
+        created = sum(1 for result in results if "error" not in result)
+
+        return APIResponse.success({
+            "creados": created,
+            "rechazados": len(results) - created,
+            "resultados": results
+        }, "Registro por lotes completado")
+
+    except HashingUnavailableError as e:
+        return APIResponse.error(str(e), 503)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
@@ -0,0 +1,16 @@
+from flask import Blueprint
+import config
+from services.catalog_service import CatalogService
+from utils.response import APIResponse
+
+catalog_bp = Blueprint('catalog', __name__)
+
+
+@catalog_bp.route('/servicios', methods=['GET'])
+@APIResponse.conditional(per_user=False, versions=CatalogService.version, max_age=config.CATALOG_MAX_AGE)
+def get_services():
+    try:
+        services = [dict(service) for service in CatalogService.services().values()]
+        return APIResponse.success({"data": services})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
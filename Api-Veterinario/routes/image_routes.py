@@ -0,0 +1,36 @@
+from flask import Blueprint, request, send_file
+import config
+from services.image_service import ImageService
+from utils.response import APIResponse
+
+image_bp = Blueprint('image', __name__)
+
+
+@image_bp.route('/imagenes/<image_hash>', methods=['GET'])
+def get_image(image_hash):
+    # Public on purpose: <img> tags cannot send the token, and a SHA-256
+    # of the content cannot be guessed without already having the file.
+    try:
+        size = request.args.get("tamano", type=int)
+        if size is not None and size not in config.IMAGE_THUMBNAIL_SIZES:
+            sizes = ", ".join(str(value) for value in config.IMAGE_THUMBNAIL_SIZES)
+            return APIResponse.error(f"Tamaño no válido. Debe ser uno de: {sizes}")
+
+        resolved = ImageService.resolve(image_hash, size)
+        if resolved is None:
+            return APIResponse.error("Imagen no encontrada", 404)
+        path, mimetype, etag, final = resolved
+
+        # Range requests and If-None-Match are handled by send_file.
+        response = send_file(
+            path, mimetype=mimetype, conditional=True, etag=etag,
+            max_age=config.IMAGE_CACHE_MAX_AGE if final else 0
+        )
+        response.cache_control.public = True
+        if final:
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
@@ -0,0 +1,281 @@
+import uuid
+
+from flask import Blueprint, request
+import config
+from models.medical_history import MedicalHistory
+from models.pet import Pet
+from services.image_service import ImageService, ImageTooLargeError
+from services.search_service import SearchService
+from utils.response import APIResponse
+from utils.security import Security
+
+pet_bp = Blueprint('pet', __name__)
+
+STAFF_ROLES = ('empleado', 'programador')
+
+
+def _owner_scope(usuario_actual):
+    # Clients only ever see their own pets; staff may act on any owner.
+    if usuario_actual['rol'] in STAFF_ROLES:
+        return None
+    return usuario_actual['id']
+
+
+def _with_history():
+    return request.args.get("historial", "false").lower() in ("1", "true")
+
+
+@pet_bp.route('/mascotas', methods=['GET'])
+@Security.token_required
+@APIResponse.conditional("mascota")
+def get_pets(usuario_actual):
+    try:
+        owner_id = _owner_scope(usuario_actual)
+        if owner_id is None:
+            owner_id = request.args.get("usuario_id", type=int)
+            if owner_id is None:
+                return APIResponse.missing_fields(["usuario_id"])
+
+        after_id = request.args.get("after_id")
+        if after_id is not None:
+            try:
+                after_id = str(uuid.UUID(after_id))
+            except ValueError:
+                return APIResponse.error("after_id no es un identificador de mascota válido")
+
+        limit = request.args.get("limit", config.PETS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, config.PETS_PAGE_MAX))
+
+        pets = Pet.get_page(owner_id, after_id, limit)
+        next_after_id = pets[-1]['id_mascota'] if len(pets) == limit else None
+        return APIResponse.success({
+            "data": pets,
+            "siguiente_after_id": next_after_id
+        })
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/por_propietarios', methods=['GET'])
+@Security.token_required
+@Security.role_required(*STAFF_ROLES)
+@APIResponse.conditional("mascota")
+def get_pets_by_owners(usuario_actual):
+    try:
+        raw_ids = request.args.get("usuarios", "")
+        try:
+            owner_ids = [int(value) for value in raw_ids.split(",") if value.strip()]
+        except ValueError:
+            return APIResponse.error("El parámetro usuarios debe ser una lista de ids separados por comas")
+
+        if not owner_ids:
+            return APIResponse.missing_fields(["usuarios"])
+        if len(owner_ids) > config.PETS_BATCH_MAX_OWNERS:
+            return APIResponse.error(f"No se pueden consultar más de {config.PETS_BATCH_MAX_OWNERS} propietarios")
+
+        pets_by_owner = Pet.get_by_owners(owner_ids)
+        return APIResponse.success({
+            "data": {str(owner_id): pets for owner_id, pets in pets_by_owner.items()}
+        })
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/buscar', methods=['GET'])
+@Security.token_required
+def search_pets(usuario_actual):
+    try:
+        limit = request.args.get("limit", config.SEARCH_LIMIT, type=int)
+        try:
+            pets = SearchService.search_pets(request.args.get("q"), limit, _owner_scope(usuario_actual))
+        except ValueError as e:
+            return APIResponse.error(str(e))
+        return APIResponse.success({"data": pets})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/autocompletar', methods=['GET'])
+@Security.token_required
+def autocomplete_pets(usuario_actual):
+    try:
+        limit = request.args.get("limit", config.AUTOCOMPLETE_LIMIT, type=int)
+        try:
+            pets = SearchService.autocomplete_pets(request.args.get("q"), limit, _owner_scope(usuario_actual))
+        except ValueError as e:
+            return APIResponse.error(str(e))
+        return APIResponse.success({"data": pets})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>', methods=['GET'])
+@Security.token_required
+def get_pet(usuario_actual, id_mascota):
+    try:
+        pet = Pet.get_by_id(str(id_mascota), _owner_scope(usuario_actual))
+        if not pet:
+            return APIResponse.error("Mascota no encontrada", 404)
+        if _with_history():
+            # Only the latest page; older entries come from /historial.
+            pet['historial'] = MedicalHistory.get_page(str(id_mascota), limit=config.HISTORY_PAGE_SIZE)
+        return APIResponse.success(pet)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas', methods=['POST'])
+@Security.token_required
+def create_pet(usuario_actual):
+    try:
+        body_request = request.json
+        if not body_request:
+            return APIResponse.error("Datos no proporcionados")
+
+        owner_id = _owner_scope(usuario_actual)
+        if owner_id is None:
+            owner_id = body_request.get("usuario_id")
+            if not owner_id:
+                return APIResponse.missing_fields(["usuario_id"])
+
+        # Same rule as POST /mascotas/<id>/historial.
+        history = body_request.get("historial_medico")
+        if history and usuario_actual['rol'] not in STAFF_ROLES:
+            return APIResponse.forbidden("Solo el personal de la clínica puede escribir el historial médico")
+
+        try:
+            pet_id = Pet.create(owner_id, body_request, history, usuario_actual['id'])
+            return APIResponse.success({
+                "id_mascota": pet_id,
+                "id_usuario": owner_id
+            }, "Mascota registrada exitosamente", 201)
+        except ValueError as e:
+            return APIResponse.error(str(e))
+
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>', methods=['PUT'])
+@Security.token_required
+def update_pet(usuario_actual, id_mascota):
+    try:
+        body_request = request.json
+        if not body_request:
+            return APIResponse.error("Datos no proporcionados")
+
+        if "historial_medico" in body_request:
+            return APIResponse.error("El historial médico no se puede reescribir; las entradas se añaden con POST /mascotas/<id>/historial")
+
+        try:
+            if not Pet.update(str(id_mascota), body_request, _owner_scope(usuario_actual)):
+                return APIResponse.error("Mascota no encontrada", 404)
+            return APIResponse.success({"id_mascota": str(id_mascota)}, "Mascota actualizada exitosamente")
+        except ValueError as e:
+            return APIResponse.error(str(e))
+
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>/imagen', methods=['POST'])
+@Security.token_required
+def upload_pet_image(usuario_actual, id_mascota):
+    try:
+        upload = request.files.get("imagen")
+        if upload is None:
+            return APIResponse.missing_fields(["imagen"])
+
+        # Checked before anything is written to disk.
+        owner_id = _owner_scope(usuario_actual)
+        if not Pet.get_by_id(str(id_mascota), owner_id):
+            return APIResponse.error("Mascota no encontrada", 404)
+
+        try:
+            image_hash = ImageService.store(upload.stream)
+        except ImageTooLargeError as e:
+            return APIResponse.error(str(e), 413)
+        except ValueError as e:
+            return APIResponse.error(str(e))
+
+        if not Pet.set_image(str(id_mascota), image_hash, owner_id):
+            return APIResponse.error("Mascota no encontrada", 404)
+        ImageService.schedule_thumbnails(image_hash)
+        return APIResponse.success({
+            "id_mascota": str(id_mascota),
+            "imagen": image_hash
+        }, "Imagen actualizada exitosamente")
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>', methods=['DELETE'])
+@Security.token_required
+def delete_pet(usuario_actual, id_mascota):
+    try:
+        if not Pet.delete(str(id_mascota), _owner_scope(usuario_actual)):
+            return APIResponse.error("Mascota no encontrada", 404)
+        return APIResponse.success({"id_mascota": str(id_mascota)}, "Mascota eliminada exitosamente")
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>/historial', methods=['GET'])
+@Security.token_required
+@APIResponse.conditional("entrada_historial")
+def get_pet_history(usuario_actual, id_mascota):
+    try:
+        before_id = request.args.get("before_id", type=int)
+        limit = request.args.get("limit", config.HISTORY_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, config.HISTORY_PAGE_MAX))
+
+        owner_id = _owner_scope(usuario_actual)
+        entries = MedicalHistory.get_page(str(id_mascota), before_id, limit, owner_id)
+        # An empty page is only a 404 when the pet itself is not visible.
+        if not entries and Pet.get_by_id(str(id_mascota), owner_id) is None:
+            return APIResponse.error("Mascota no encontrada", 404)
+        next_before_id = entries[-1]['id_entrada'] if len(entries) == limit else None
+        return APIResponse.success({
+            "data": entries,
+            "siguiente_before_id": next_before_id
+        })
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>/historial', methods=['POST'])
+@Security.token_required
+@Security.role_required(*STAFF_ROLES)
+def add_pet_history_entry(usuario_actual, id_mascota):
+    try:
+        body_request = request.json
+        if not body_request:
+            return APIResponse.error("Datos no proporcionados")
+        if not body_request.get("texto"):
+            return APIResponse.missing_fields(["texto"])
+
+        try:
+            entry_id = MedicalHistory.append(str(id_mascota), body_request["texto"], usuario_actual['id'])
+        except ValueError as e:
+            return APIResponse.error(str(e))
+        if entry_id is None:
+            return APIResponse.error("Mascota no encontrada", 404)
+
+        return APIResponse.success({
+            "id_entrada": entry_id,
+            "id_mascota": str(id_mascota)
+        }, "Entrada añadida al historial", 201)
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@pet_bp.route('/mascotas/<uuid:id_mascota>/historial/exportar', methods=['GET'])
+@Security.token_required
+def export_pet_history(usuario_actual, id_mascota):
+    try:
+        owner_id = _owner_scope(usuario_actual)
+        if Pet.get_by_id(str(id_mascota), owner_id) is None:
+            return APIResponse.error("Mascota no encontrada", 404)
+        return APIResponse.stream(MedicalHistory.stream(str(id_mascota), owner_id), "ndjson")
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
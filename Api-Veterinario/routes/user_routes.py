@@ -1,5 +1,8 @@
 from flask import Blueprint, request
+import config
 from models.user import User, Client, Employee, Programmer
+from services.image_service import ImageService, ImageTooLargeError
+from services.search_service import SearchService
 from utils.response import APIResponse
 from utils.security import Security
 
@@ -9,10 +12,92 @@ user_bp = Blueprint('user', __name__)
 @user_bp.route('/obtener_usuarios', methods=['GET'])
 @Security.token_required
 @Security.role_required('programador')
+@APIResponse.conditional("Usuario")
 def get_users(usuario_actual):
     try:
-        users = User.get_all()
-        return APIResponse.success(users)
+        after_id = request.args.get("after_id", type=int)
+        stream = request.args.get("stream")
+
+        if stream:
+            if stream not in ("json", "ndjson"):
+                return APIResponse.error("Formato de streaming no válido. Debe ser json o ndjson")
+            return APIResponse.stream(User.stream_all(after_id), stream)
+
+        # Without paging parameters the endpoint keeps its original contract.
+        if after_id is None and "limit" not in request.args:
+            return APIResponse.success(User.get_all())
+
+        limit = request.args.get("limit", config.USERS_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, config.USERS_PAGE_MAX))
+
+        users = User.get_page(after_id, limit)
+        next_after_id = users[-1]['idusuario'] if users and len(users) == limit else None
+        return APIResponse.success({
+            "data": users or [],
+            "siguiente_after_id": next_after_id
+        })
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@user_bp.route('/usuarios/buscar', methods=['GET'])
+@Security.token_required
+@Security.role_required('empleado', 'programador')
+def search_users(usuario_actual):
+    try:
+        limit = request.args.get("limit", config.SEARCH_LIMIT, type=int)
+        try:
+            users = SearchService.search_users(request.args.get("q"), limit)
+        except ValueError as e:
+            return APIResponse.error(str(e))
+        return APIResponse.success({"data": users})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@user_bp.route('/usuarios/autocompletar', methods=['GET'])
+@Security.token_required
+@Security.role_required('empleado', 'programador')
+def autocomplete_users(usuario_actual):
+    try:
+        limit = request.args.get("limit", config.AUTOCOMPLETE_LIMIT, type=int)
+        try:
+            users = SearchService.autocomplete_users(request.args.get("q"), limit)
+        except ValueError as e:
+            return APIResponse.error(str(e))
+        return APIResponse.success({"data": users})
+    except Exception as e:
+        return APIResponse.error(str(e), 500)
+
+
+@user_bp.route('/usuarios/<int:id_usuario>/imagen', methods=['POST'])
+@Security.token_required
+def upload_user_image(usuario_actual, id_usuario):
+    try:
+        if usuario_actual['rol'] != 'programador' and usuario_actual['id'] != id_usuario:
+            return APIResponse.forbidden()
+
+        upload = request.files.get("imagen")
+        if upload is None:
+            return APIResponse.missing_fields(["imagen"])
+
+        if not User.get_by_id(id_usuario):
+            return APIResponse.not_found("Usuario")
+
+        try:
+            image_hash = ImageService.store(upload.stream)
+        except ImageTooLargeError as e:
+            return APIResponse.error(str(e), 413)
+        except ValueError as e:
+            return APIResponse.error(str(e))
+
+        if not User.set_image(id_usuario, image_hash):
+            return APIResponse.not_found("Usuario")
+        ImageService.schedule_thumbnails(image_hash)
+        return APIResponse.success({
+            "id_usuario": id_usuario,
+            "imagen": image_hash
+        }, "Imagen actualizada exitosamente")
     except Exception as e:
         return APIResponse.error(str(e), 500)
 
@@ -36,9 +121,9 @@ def register_client(usuario_actual):
             return APIResponse.missing_fields(missing)
 
         try:
-            client = Client.create(user_id, address, phone)
+            client_id = Client.create(user_id, address, phone)
             return APIResponse.success({
-                "id_cliente": client['idCliente'],
+                "id_cliente": client_id,
                 "id_usuario": user_id
             }, "Cliente registrado exitosamente", 201)
         except ValueError as e:
@@ -79,11 +164,11 @@ def register_employee(usuario_actual):
             return APIResponse.missing_fields(missing)
 
         try:
-            employee = Employee.create(
+            employee_id = Employee.create(
                 user_id, specialty, full_name, dni, phone, address, hire_date
             )
             return APIResponse.success({
-                "id_empleado": employee['idEmpleado'],
+                "id_empleado": employee_id,
                 "id_usuario": user_id
             }, "Empleado registrado exitosamente", 201)
         except ValueError as e:
@@ -120,9 +205,9 @@ def register_programmer(usuario_actual):
             return APIResponse.missing_fields(missing)
 
         try:
-            programmer = Programmer.create(user_id, dni, phone, address, hire_date)
+            programmer_id = Programmer.create(user_id, dni, phone, address, hire_date)
             return APIResponse.success({
-                "id_programador": programmer['idProgramador'],
+                "id_programador": programmer_id,
                 "id_usuario": user_id
             }, "Programador registrado exitosamente", 201)
         except ValueError as e:
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+
+from models.async_user import AsyncUser
+from utils.hashing import HashingUnavailableError
+from utils.security import Security
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthService:
+    @staticmethod
+    async def login(username, password):
+        user = await AsyncUser.get_by_name(username)
+
+        if not user:
+            return None, "Usuario no encontrado"
+
+        if not await asyncio.to_thread(Security.check_password, user['contraseña'], password):
+            return None, "Contraseña incorrecta"
+
+        if Security.needs_rehash(user['contraseña']):
+            try:
+                await AsyncUser.update_password(user['idusuario'], password)
+            except Exception as e:
+                logger.warning("No se pudo actualizar el hash de la contraseña: %s", e)
+
+        token = Security.generate_token(user)
+
+        return {
+            "id": user['idusuario'],
+            "nombre": user['nombre'],
+            "rol": user['rol'],
+            "token": token
+        }, "Login exitoso"
+
+    @staticmethod
+    async def register(username, password, role):
+        try:
+            user_id = await AsyncUser.create(username, password, role)
+
+            if not user_id:
+                return None, "Error al crear usuario"
+
+            return {
+                "id": user_id,
+                "nombre": username,
+                "rol": role
+            }, "Usuario registrado con éxito"
+
+        except ValueError as e:
+            return None, str(e)
+        except HashingUnavailableError:
+            raise
+        except Exception as e:
+            return None, f"Error en el registro: {str(e)}"
@@ -1,11 +1,17 @@
-from models.user import User
+import logging
+
+from db.database import Database
+from models.user import User, Client, Employee, Programmer
+from utils.hashing import HashingUnavailableError
 from utils.security import Security
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
     @staticmethod
     def login(username, password):
-        user = User.get_by_name(username)
+        user = User.get_credentials(username)
 
         if not user:
             return None, "Usuario no encontrado"
@@ -13,10 +19,16 @@ class AuthService:
         if not Security.check_password(user['contraseña'], password):
             return None, "Contraseña incorrecta"
 
+        if Security.needs_rehash(user['contraseña']):
+            try:
+                User.update_password(user['idusuario'], password)
+            except Exception as e:
+                logger.warning("No se pudo actualizar el hash de la contraseña: %s", e)
+
         token = Security.generate_token(user)
 
         return {
-            "id": user['idUsuario'],
+            "id": user['idusuario'],
             "nombre": user['nombre'],
             "rol": user['rol'],
             "token": token
@@ -30,18 +42,6 @@ class AuthService:
             if not user_id:
                 return None, "Error al crear usuario"
 
-            print(f"Usuario creado con ID: {user_id}, tipo: {type(user_id)}")
-
-            user = User.get_by_id(user_id)
-
-            if not user:
-                print(f"No se pudo encontrar usuario con ID: {user_id}")
-                return {
-                    "id": user_id,
-                    "nombre": username,
-                    "rol": role
-                }, "Usuario registrado con éxito, pero no se pudo recuperar toda la información"
-
             return {
                 "id": user_id,
                 "nombre": username,
@@ -50,5 +50,128 @@ class AuthService:
 
         except ValueError as e:
             return None, str(e)
+        except HashingUnavailableError:
+            raise
         except Exception as e:
-            return None, f"Error en el registro: {str(e)}"
\ No newline at end of file
+            return None, f"Error en el registro: {str(e)}"
+
+    _PROFILE_FIELDS = {
+        'cliente': ("direccion", "telefono"),
+        'empleado': ("especialidad", "nombre_completo", "dni", "telefono", "direccion"),
+        'programador': ("dni", "telefono", "direccion"),
+    }
+
+    @staticmethod
+    def _build_profile(role, item):
+        if role == 'cliente':
+            return Client, Client.build_data(None, item["direccion"], item["telefono"])
+        if role == 'empleado':
+            return Employee, Employee.build_data(
+                None, item["especialidad"], item["nombre_completo"], item["dni"],
+                item["telefono"], item["direccion"], item.get("fecha_contratacion")
+            )
+        return Programmer, Programmer.build_data(
+            None, item["dni"], item["telefono"], item["direccion"], item.get("fecha_contratacion")
+        )
+
+    @staticmethod
+    def register_batch(items):
+        results = [{"indice": index} for index in range(len(items))]
+        pending = []
+        seen_names = set()
+
+        for index, item in enumerate(items):
+            result = results[index]
+            if not isinstance(item, dict):
+                result["error"] = "Formato de usuario no válido"
+                continue
+
+            username = item.get("nombre")
+            password = item.get("contraseña")
+
+            # A non-string value would break the duplicate check, hashing or
+            # the batch insert, failing every item instead of this one.
+            invalid = [
+                field for field in ("nombre", "contraseña", "rol")
+                if item.get(field) is not None and not isinstance(item.get(field), str)
+            ]
+            if invalid:
+                result["error"] = f"Los campos deben ser texto: {', '.join(invalid)}"
+                continue
+            result["nombre"] = username
+
+            try:
+                role = User.validate_role(item.get("rol"))
+            except ValueError as e:
+                result["error"] = str(e)
+                continue
+
+            missing = [field for field in ("nombre", "contraseña") if not item.get(field)]
+            missing += [field for field in AuthService._PROFILE_FIELDS[role] if not item.get(field)]
+            if missing:
+                result["error"] = f"Campos obligatorios faltantes: {', '.join(missing)}"
+                continue
+
+            optional = ("fecha_contratacion",) if role != 'cliente' else ()
+            invalid = [
+                field for field in AuthService._PROFILE_FIELDS[role] + optional
+                if item.get(field) is not None and not isinstance(item.get(field), str)
+            ]
+            if invalid:
+                result["error"] = f"Los campos deben ser texto: {', '.join(invalid)}"
+                continue
+
+            if username in seen_names:
+                result["error"] = "El nombre de usuario está repetido en el lote"
+                continue
+            seen_names.add(username)
+
+            result["rol"] = role
+            pending.append((index, username, password, role, item))
+
+        if not pending:
+            return results
+
+        hashed_passwords = Security.hash_passwords([password for _, _, password, _, _ in pending])
+
+        with Database.transaction() as session:
+            created = session.insert_many(
+                "Usuario",
+                [
+                    {'nombre': username, 'contraseña': hashed, 'rol': role}
+                    for (_, username, _, role, _), hashed in zip(pending, hashed_passwords)
+                ],
+                returning="idUsuario, nombre",
+                on_conflict="nombre"
+            )
+            user_ids = {row['nombre']: row['idusuario'] for row in created}
+
+            # One multi-row insert per profile table and column set.
+            profile_groups = {}
+            for index, username, _, role, item in pending:
+                if username not in user_ids:
+                    results[index]["error"] = "El nombre de usuario ya existe"
+                    continue
+
+                results[index]["id"] = user_ids[username]
+                model, data = AuthService._build_profile(role, item)
+                data['Usuario_idUsuario'] = user_ids[username]
+                profile_groups.setdefault((model, tuple(data.keys())), []).append(data)
+
+            for (model, _), rows in profile_groups.items():
+                profile_rows = session.insert_many(
+                    model.table,
+                    rows,
+                    returning=f"Usuario_idUsuario, {model.id_column}",
+                    on_conflict="Usuario_idUsuario"
+                )
+                profile_ids = {row['usuario_idusuario']: row[model.id_column.lower()] for row in profile_rows}
+                for index, username, _, _, _ in pending:
+                    user_id = user_ids.get(username)
+                    if user_id in profile_ids:
+                        results[index]["id_perfil"] = profile_ids[user_id]
+
+        for username in user_ids:
+            User.invalidate(username=username)
+
+        return results
@@ -0,0 +1,171 @@
+import logging
+import os
+import select
+import threading
+import time
+from types import MappingProxyType
+
+import psycopg2
+from psycopg2 import extensions
+
+import config
+from db.database import Database
+
+logger = logging.getLogger(__name__)
+
+CATALOG_TABLES = ("rol", "servicio")
+# Roles the API has behaviour for; catalog rows outside this set (the
+# seed's 'admin', for one) are never accepted as a registration role.
+SUPPORTED_ROLES = frozenset(("programador", "empleado", "cliente"))
+
+
+class CatalogService:
+    # Both maps are immutable and replaced as a whole on reload, so readers
+    # never lock and never see a half-loaded catalog.
+    _services = MappingProxyType({})
+    _roles = SUPPORTED_ROLES
+    _versions = None
+    _loaded_at = None
+    _reloads = 0
+    _listener = None
+    _pid = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def load():
+        # Versions are read first: a write landing in between only causes
+        # one extra reload later, never a stale catalog marked as current.
+        versions = Database.table_versions(CATALOG_TABLES)
+        roles = Database.select("rol", "nombre_rol", row_format="tuple") or []
+        services = Database.select(
+            "servicio", "id_servicio, nombre_servicio, duracion_minutos", order_by="id_servicio", row_format="dict"
+        ) or []
+
+        CatalogService._roles = (frozenset(row[0].lower() for row in roles) & SUPPORTED_ROLES) or SUPPORTED_ROLES
+        CatalogService._services = MappingProxyType({
+            service['id_servicio']: MappingProxyType(dict(service)) for service in services
+        })
+        CatalogService._versions = versions
+        CatalogService._loaded_at = time.time()
+        CatalogService._reloads += 1
+        logger.info("Catálogo cargado: %d roles, %d servicios", len(roles), len(services))
+
+    @staticmethod
+    def reload_if_changed():
+        if Database.table_versions(CATALOG_TABLES) != CatalogService._versions:
+            CatalogService.load()
+
+    @staticmethod
+    def _listening():
+        listener = CatalogService._listener
+        return CatalogService._pid == os.getpid() and listener is not None and listener.is_alive()
+
+    @staticmethod
+    def _ensure_current():
+        # Loads lazily on first use and retries while the database is
+        # unreachable. Without a listener in this process, changes are
+        # picked up by a version read at most once per check interval.
+        now = time.monotonic()
+        if CatalogService._versions is None:
+            interval = config.CATALOG_RETRY_INTERVAL
+        elif not CatalogService._listening():
+            interval = config.CATALOG_CHECK_INTERVAL
+        else:
+            return
+        if now - CatalogService._checked_at < interval or not CatalogService._lock.acquire(blocking=False):
+            return
+
+        try:
+            CatalogService._checked_at = now
+            if CatalogService._versions is None:
+                CatalogService.load()
+            else:
+                CatalogService.reload_if_changed()
+        except psycopg2.Error as e:
+            logger.error("No se pudo cargar el catálogo: %s", e)
+        finally:
+            CatalogService._lock.release()
+
+    @staticmethod
+    def start_listener():
+        # Runs before every request (see create_app) and at ASGI startup,
+        # so each worker process starts its own listener after any pre-fork
+        # (gunicorn, uwsgi): threads do not survive a fork.
+        if not config.CATALOG_LISTEN_ENABLED or CatalogService._listening():
+            return
+        with CatalogService._lock:
+            if CatalogService._listening():
+                return
+            CatalogService._pid = os.getpid()
+            CatalogService._listener = threading.Thread(
+                target=CatalogService._listen, name="catalog-listener", daemon=True
+            )
+            CatalogService._listener.start()
+
+    @staticmethod
+    def _listen():
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = psycopg2.connect(**config.DB_CONFIG)
+                connection.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute("LISTEN catalogo")
+                # Anything changed while we were not listening is caught here.
+                CatalogService.reload_if_changed()
+                backoff = 1
+
+                while True:
+                    if select.select([connection], [], [], config.CATALOG_CHECK_INTERVAL) == ([], [], []):
+                        # Safety net for notifications lost outside LISTEN.
+                        CatalogService.reload_if_changed()
+                        continue
+                    connection.poll()
+                    if connection.notifies:
+                        connection.notifies.clear()
+                        CatalogService.load()
+            except (psycopg2.Error, OSError) as e:
+                logger.warning("Escucha del catálogo interrumpida, reintentando en %s s: %s", backoff, e)
+            finally:
+                if connection is not None and not connection.closed:
+                    connection.close()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    @staticmethod
+    def roles():
+        CatalogService._ensure_current()
+        return CatalogService._roles
+
+    @staticmethod
+    def loaded_roles():
+        # No I/O: for the async server, which loads the catalog off the
+        # event loop at startup and keeps it current with the listener.
+        return CatalogService._roles
+
+    @staticmethod
+    def services():
+        CatalogService._ensure_current()
+        return CatalogService._services
+
+    @staticmethod
+    def service(service_id):
+        return CatalogService.services().get(service_id)
+
+    @staticmethod
+    def version():
+        CatalogService._ensure_current()
+        return CatalogService._versions
+
+    @staticmethod
+    def stats():
+        return {
+            'roles': sorted(CatalogService._roles),
+            'services': len(CatalogService._services),
+            'versions': dict(zip(CATALOG_TABLES, CatalogService._versions or ())),
+            'loaded_at': CatalogService._loaded_at,
+            'reloads': CatalogService._reloads,
+            'listening': CatalogService._listening(),
+        }
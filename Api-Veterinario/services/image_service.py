@@ -0,0 +1,269 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from db.database import Database
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+CHUNK_SIZE = 64 * 1024
+
+SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+def detect_mimetype(header):
+    for signature, mimetype in SIGNATURES:
+        if header.startswith(signature):
+            return mimetype
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class ImageService:
+    _executor = None
+    _pid = None
+    _pending = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def is_valid_hash(image_hash):
+        return bool(image_hash) and HASH_PATTERN.match(image_hash) is not None
+
+    @staticmethod
+    def path(image_hash, size=None):
+        # Two levels of fan-out keep every directory small.
+        name = image_hash if size is None else f"{image_hash}_{size}.jpg"
+        return os.path.join(config.IMAGE_STORAGE_DIR, image_hash[:2], image_hash[2:4], name)
+
+    @staticmethod
+    def mimetype(image_hash):
+        with open(ImageService.path(image_hash), "rb") as image_file:
+            return detect_mimetype(image_file.read(16)) or "application/octet-stream"
+
+    @staticmethod
+    def store(stream):
+        # The upload is hashed while it is copied to a temporary file on the
+        # same filesystem, so the final rename is atomic and an identical
+        # upload only costs the hash.
+        os.makedirs(config.IMAGE_STORAGE_DIR, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=config.IMAGE_STORAGE_DIR, prefix=".subida_")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                header = stream.read(CHUNK_SIZE)
+                if not detect_mimetype(header[:16]):
+                    raise ValueError("Formato de imagen no soportado. Debe ser JPEG, PNG, GIF o WebP")
+
+                chunk = header
+                while chunk:
+                    size += len(chunk)
+                    if size > config.IMAGE_MAX_BYTES:
+                        raise ImageTooLargeError(
+                            f"La imagen no puede superar {config.IMAGE_MAX_BYTES // (1024 * 1024)} MB"
+                        )
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    chunk = stream.read(CHUNK_SIZE)
+
+            image_hash = digest.hexdigest()
+            final_path = ImageService.path(image_hash)
+            try:
+                # Refreshing the mtime keeps a reused file out of the next
+                # sweep while this upload's database write is in flight.
+                os.utime(final_path)
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, final_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        return image_hash
+
+    @staticmethod
+    def _referenced(hashes):
+        referenced = set()
+        hashes = list(hashes)
+        for start in range(0, len(hashes), 1000):
+            batch = hashes[start:start + 1000]
+            rows = Database.execute_query(
+                "SELECT imagen FROM Usuario WHERE imagen = ANY(%s) "
+                "UNION SELECT imagen FROM mascota WHERE imagen = ANY(%s)",
+                (batch, batch),
+                row_format="tuple"
+            ) or []
+            referenced.update(row[0] for row in rows)
+        return referenced
+
+    @staticmethod
+    def sweep(grace=None):
+        # Uploads are written before the row that points at them, so files
+        # are never removed eagerly: anything older than the grace period
+        # that no row references is collected here, thumbnails included.
+        grace = config.IMAGE_SWEEP_GRACE if grace is None else grace
+        cutoff = time.time() - grace
+        originals = {}
+        thumbnails = {}
+        temporary = []
+
+        for directory, _, names in os.walk(config.IMAGE_STORAGE_DIR):
+            for name in names:
+                path = os.path.join(directory, name)
+                if name.startswith("."):
+                    temporary.append(path)
+                elif HASH_PATTERN.match(name):
+                    originals[name] = path
+                else:
+                    thumbnails.setdefault(name.split("_", 1)[0], []).append(path)
+
+        def is_old(path):
+            try:
+                return os.stat(path).st_mtime < cutoff
+            except FileNotFoundError:
+                return False
+
+        candidates = [image_hash for image_hash, path in originals.items() if is_old(path)]
+        unreferenced = set(candidates) - ImageService._referenced(candidates)
+        removed = {'imagenes': 0, 'miniaturas': 0, 'temporales': 0}
+
+        def remove(path, kind):
+            try:
+                os.unlink(path)
+                removed[kind] += 1
+            except FileNotFoundError:
+                pass
+
+        for image_hash in unreferenced:
+            # Checked again: an upload may have reused the file meanwhile.
+            if is_old(originals[image_hash]):
+                remove(originals[image_hash], 'imagenes')
+                for path in thumbnails.pop(image_hash, ()):
+                    remove(path, 'miniaturas')
+
+        for image_hash, paths in thumbnails.items():
+            if image_hash not in originals:
+                for path in paths:
+                    remove(path, 'miniaturas')
+        for path in temporary:
+            if is_old(path):
+                remove(path, 'temporales')
+
+        logger.info("Limpieza de imágenes: %s", removed)
+        return removed
+
+    @staticmethod
+    def schedule_thumbnails(image_hash):
+        for thumbnail_size in config.IMAGE_THUMBNAIL_SIZES:
+            ImageService.schedule_thumbnail(image_hash, thumbnail_size)
+
+    @staticmethod
+    def _get_executor():
+        # Threads do not survive a fork, so each worker builds its own pool.
+        if ImageService._executor is None or ImageService._pid != os.getpid():
+            with ImageService._lock:
+                if ImageService._executor is None or ImageService._pid != os.getpid():
+                    ImageService._executor = ThreadPoolExecutor(
+                        max_workers=config.IMAGE_THUMBNAIL_WORKERS, thread_name_prefix="miniaturas"
+                    )
+                    ImageService._pending = set()
+                    ImageService._pid = os.getpid()
+        return ImageService._executor
+
+    @staticmethod
+    def schedule_thumbnail(image_hash, size):
+        if Image is None or os.path.exists(ImageService.path(image_hash, size)):
+            return False
+
+        executor = ImageService._get_executor()
+        key = (image_hash, size)
+        with ImageService._lock:
+            if key in ImageService._pending:
+                return True
+            ImageService._pending.add(key)
+
+        future = executor.submit(ImageService._make_thumbnail, image_hash, size)
+        future.add_done_callback(lambda _: ImageService._done(key))
+        return True
+
+    @staticmethod
+    def _done(key):
+        with ImageService._lock:
+            ImageService._pending.discard(key)
+
+    @staticmethod
+    def _make_thumbnail(image_hash, size):
+        target = ImageService.path(image_hash, size)
+        try:
+            with Image.open(ImageService.path(image_hash)) as image:
+                image = ImageOps.exif_transpose(image)
+                image.thumbnail((size, size))
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix=".miniatura_")
+                try:
+                    with os.fdopen(fd, "wb") as temp_file:
+                        image.save(temp_file, "JPEG", quality=config.IMAGE_THUMBNAIL_QUALITY, optimize=True)
+                    os.chmod(temp_path, 0o644)
+                    os.replace(temp_path, target)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.unlink(temp_path)
+                    raise
+        except Exception:
+            logger.exception("No se pudo generar la miniatura %s de %s", size, image_hash)
+
+    @staticmethod
+    def resolve(image_hash, size=None):
+        # Returns (path, mimetype, etag, final). A missing thumbnail is
+        # queued and the original served meanwhile; that response is not
+        # final and must not be cached as if it were the thumbnail.
+        if not ImageService.is_valid_hash(image_hash):
+            return None
+        original = ImageService.path(image_hash)
+        if not os.path.exists(original):
+            return None
+
+        if size is not None:
+            thumbnail = ImageService.path(image_hash, size)
+            if os.path.exists(thumbnail):
+                return thumbnail, "image/jpeg", f"{image_hash}-{size}", True
+            ImageService.schedule_thumbnail(image_hash, size)
+            return original, ImageService.mimetype(image_hash), image_hash, False
+
+        return original, ImageService.mimetype(image_hash), image_hash, True
+
+    @staticmethod
+    def stats():
+        with ImageService._lock:
+            return {
+                'thumbnails': Image is not None,
+                'pending': len(ImageService._pending),
+                'workers': config.IMAGE_THUMBNAIL_WORKERS,
+            }
@@ -0,0 +1,281 @@
+import csv
+import datetime
+import decimal
+import io
+import json
+import time
+
+from db.database import Database
+from models.user import User
+from utils.security import Security
+
+STAGING_TABLE = "importacion_staging"
+
+ENTITIES = {
+    'usuarios': {
+        'fields': ("nombre", "contraseña", "rol"),
+        'required': ("nombre", "contraseña", "rol"),
+        'key': "nombre",
+        'rejections': f"""
+            SELECT s.linea, 'El nombre de usuario ya existe'
+            FROM {STAGING_TABLE} s
+            JOIN Usuario u ON u.nombre = s.nombre
+        """,
+        'insert': f"""
+            WITH insertadas AS (
+                INSERT INTO Usuario (nombre, contraseña, rol)
+                SELECT s.nombre, s.contraseña, s.rol
+                FROM {STAGING_TABLE} s
+                ON CONFLICT (nombre) DO NOTHING
+                RETURNING nombre
+            )
+            SELECT s.linea FROM insertadas i JOIN {STAGING_TABLE} s ON s.nombre = i.nombre
+        """,
+    },
+    'clientes': {
+        'fields': ("nombre_usuario", "direccion", "telefono"),
+        'required': ("nombre_usuario", "direccion", "telefono"),
+        'key': "nombre_usuario",
+        'rejections': f"""
+            SELECT s.linea,
+                   CASE WHEN u.idUsuario IS NULL THEN 'Usuario no encontrado'
+                        WHEN u.rol <> 'cliente' THEN 'El usuario no tiene rol de cliente'
+                        ELSE 'Este usuario ya tiene un registro de cliente' END
+            FROM {STAGING_TABLE} s
+            LEFT JOIN Usuario u ON u.nombre = s.nombre_usuario
+            LEFT JOIN Cliente c ON c.Usuario_idUsuario = u.idUsuario
+            WHERE u.idUsuario IS NULL OR u.rol <> 'cliente' OR c.idCliente IS NOT NULL
+        """,
+        'insert': f"""
+            WITH insertadas AS (
+                INSERT INTO Cliente (Usuario_idUsuario, direccion, telefono)
+                SELECT u.idUsuario, s.direccion, s.telefono
+                FROM {STAGING_TABLE} s
+                JOIN Usuario u ON u.nombre = s.nombre_usuario AND u.rol = 'cliente'
+                ON CONFLICT (Usuario_idUsuario) DO NOTHING
+                RETURNING Usuario_idUsuario
+            )
+            SELECT s.linea
+            FROM insertadas i
+            JOIN Usuario u ON u.idUsuario = i.Usuario_idUsuario
+            JOIN {STAGING_TABLE} s ON s.nombre_usuario = u.nombre
+        """,
+    },
+    'empleados': {
+        'fields': ("nombre_usuario", "especialidad", "nombre_completo", "dni", "telefono", "direccion",
+                   "fecha_contratacion"),
+        'required': ("nombre_usuario", "especialidad", "nombre_completo", "dni", "telefono", "direccion"),
+        'dates': ("fecha_contratacion",),
+        'key': "nombre_usuario",
+        'rejections': f"""
+            SELECT s.linea,
+                   CASE WHEN u.idUsuario IS NULL THEN 'Usuario no encontrado'
+                        WHEN u.rol <> 'empleado' THEN 'El usuario no tiene rol de empleado'
+                        ELSE 'Este usuario ya tiene un registro de empleado' END
+            FROM {STAGING_TABLE} s
+            LEFT JOIN Usuario u ON u.nombre = s.nombre_usuario
+            LEFT JOIN Empleado e ON e.Usuario_idUsuario = u.idUsuario
+            WHERE u.idUsuario IS NULL OR u.rol <> 'empleado' OR e.idEmpleado IS NOT NULL
+        """,
+        'insert': f"""
+            WITH insertadas AS (
+                INSERT INTO Empleado (Usuario_idUsuario, especialidad, nombre_completo, dni, telefono, direccion,
+                                      fecha_contratacion)
+                SELECT u.idUsuario, s.especialidad, s.nombre_completo, s.dni, s.telefono, s.direccion,
+                       COALESCE(s.fecha_contratacion::date, CURRENT_DATE)
+                FROM {STAGING_TABLE} s
+                JOIN Usuario u ON u.nombre = s.nombre_usuario AND u.rol = 'empleado'
+                ON CONFLICT (Usuario_idUsuario) DO NOTHING
+                RETURNING Usuario_idUsuario
+            )
+            SELECT s.linea
+            FROM insertadas i
+            JOIN Usuario u ON u.idUsuario = i.Usuario_idUsuario
+            JOIN {STAGING_TABLE} s ON s.nombre_usuario = u.nombre
+        """,
+    },
+    'mascotas': {
+        'fields': ("nombre_usuario", "nombre", "especie", "raza", "edad", "peso", "notas_especiales",
+                   "historial_medico", "alergia"),
+        'required': ("nombre_usuario", "nombre", "especie"),
+        'integers': ("edad",),
+        'decimals': ("peso",),
+        'key': None,
+        'rejections': f"""
+            SELECT s.linea,
+                   CASE WHEN u.idUsuario IS NULL THEN 'Usuario no encontrado'
+                        ELSE 'El usuario no tiene rol de cliente' END
+            FROM {STAGING_TABLE} s
+            LEFT JOIN Usuario u ON u.nombre = s.nombre_usuario
+            WHERE u.idUsuario IS NULL OR u.rol <> 'cliente'
+        """,
+        # The ids are generated up front so each imported historial_medico
+        # becomes the first entrada_historial of its pet in the same
+        # statement.
+        'insert': f"""
+            WITH filas AS MATERIALIZED (
+                SELECT gen_random_uuid() AS id_mascota, u.idUsuario AS id_usuario, s.*
+                FROM {STAGING_TABLE} s
+                JOIN Usuario u ON u.nombre = s.nombre_usuario AND u.rol = 'cliente'
+            ), historial AS (
+                INSERT INTO entrada_historial (id_mascota, texto)
+                SELECT id_mascota, historial_medico FROM filas WHERE historial_medico IS NOT NULL
+            )
+            ), insertadas AS (
+                INSERT INTO mascota (id_mascota, id_usuario, nombre, especie, raza, edad, peso, notas_especiales,
+                                     alergia)
+                SELECT id_mascota, id_usuario, nombre, especie, raza, edad::integer, peso::numeric,
+                       notas_especiales, alergia
+                FROM filas
+                RETURNING id_mascota
+            )
+            SELECT f.linea FROM insertadas i JOIN filas f ON f.id_mascota = i.id_mascota
+        """,
+    },
+}
+
+
+class ImportService:
+
+    @staticmethod
+    def read_rows(stream, file_format):
+        # Yields (line_number, row) lazily so input size never matters.
+        if file_format == "ndjson":
+            for line_number, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    yield line_number, None
+                    continue
+                yield line_number, row if isinstance(row, dict) else None
+        else:
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+
+    @staticmethod
+    def validate(entity, row):
+        spec = ENTITIES[entity]
+        if row is None:
+            return None, "Fila con formato no válido"
+
+        clean = {}
+        for field in spec['fields']:
+            value = row.get(field)
+            if isinstance(value, str):
+                value = value.strip()
+            clean[field] = None if value in ("", None) else value
+
+        missing = [field for field in spec['required'] if clean[field] is None]
+        if missing:
+            return None, f"Campos obligatorios faltantes: {', '.join(missing)}"
+
+        try:
+            if entity == 'usuarios':
+                clean['rol'] = User.validate_role(str(clean['rol']))
+            for field in spec.get('integers', ()):
+                if clean[field] is not None:
+                    clean[field] = int(clean[field])
+            for field in spec.get('decimals', ()):
+                if clean[field] is not None:
+                    clean[field] = decimal.Decimal(str(clean[field]))
+            for field in spec.get('dates', ()):
+                if clean[field] is not None:
+                    clean[field] = datetime.date.fromisoformat(str(clean[field]))
+        except (ValueError, ArithmeticError) as e:
+            return None, f"Valor no válido: {e}"
+
+        return clean, None
+
+    @staticmethod
+    def _load_batch(entity, batch):
+        spec = ENTITIES[entity]
+        columns = ("linea",) + spec['fields']
+
+        if entity == 'usuarios':
+            hashed = Security.hash_passwords([row['contraseña'] for _, row in batch])
+            for (_, row), hashed_password in zip(batch, hashed):
+                row['contraseña'] = hashed_password
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for line_number, row in batch:
+            writer.writerow([line_number] + [row[field] for field in spec['fields']])
+        buffer.seek(0)
+
+        with Database.transaction() as session:
+            session.execute_query(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                f"(linea BIGINT, {', '.join(f'{field} TEXT' for field in spec['fields'])}) "
+                f"ON COMMIT DROP",
+                fetch=False
+            )
+            session.copy_from(STAGING_TABLE, columns, buffer)
+            rejected = session.execute_query(spec['rejections'], row_format='tuple') or []
+            # Each insert returns the input lines it actually wrote.
+            inserted = session.execute_query(spec['insert'], row_format='tuple') or []
+
+        if entity == 'usuarios':
+            for _, row in batch:
+                User.invalidate(username=row['nombre'])
+
+        return {row[0] for row in inserted}, dict(rejected)
+
+    @staticmethod
+    def run(entity, stream, file_format, rejects, batch_size=5000, progress=None):
+        spec = ENTITIES[entity]
+        stats = {'leidas': 0, 'importadas': 0, 'rechazadas': 0}
+        started = time.monotonic()
+
+        def reject(line_number, row, reason):
+            stats['rechazadas'] += 1
+            rejects.write(json.dumps({"linea": line_number, "motivo": reason, "fila": row},
+                                     ensure_ascii=False, default=str) + "\n")
+
+        def flush(batch):
+            inserted, rejected = ImportService._load_batch(entity, batch)
+            stats['importadas'] += len(inserted)
+            for line_number, row in batch:
+                if line_number in rejected:
+                    reject(line_number, row, rejected[line_number])
+                elif line_number not in inserted:
+                    # Passed the checks but lost an ON CONFLICT race
+                    # against a concurrent writer.
+                    reject(line_number, row, "Conflicto concurrente: el registro ya existe")
+            if progress:
+                elapsed = time.monotonic() - started
+                progress(dict(stats, segundos=round(elapsed, 2),
+                              filas_por_segundo=round(stats['leidas'] / elapsed, 1) if elapsed else 0.0))
+
+        batch = []
+        batch_keys = set()
+        for line_number, row in ImportService.read_rows(stream, file_format):
+            stats['leidas'] += 1
+            clean, error = ImportService.validate(entity, row)
+            if error:
+                reject(line_number, row, error)
+                continue
+
+            key = spec['key']
+            if key:
+                if clean[key] in batch_keys:
+                    reject(line_number, row, "Registro repetido en el archivo")
+                    continue
+                batch_keys.add(clean[key])
+
+            batch.append((line_number, clean))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+                batch_keys = set()
+
+        if batch:
+            flush(batch)
+
+        elapsed = time.monotonic() - started
+        stats['segundos'] = round(elapsed, 2)
+        stats['filas_por_segundo'] = round(stats['leidas'] / elapsed, 1) if elapsed else 0.0
+        return stats
@@ -0,0 +1,310 @@
+import bisect
+import datetime
+import heapq
+import logging
+import threading
+import time
+
+import psycopg2
+import psycopg2.errors
+
+import config
+from db.database import Database
+from services.catalog_service import CatalogService
+
+logger = logging.getLogger(__name__)
+
+WATCHED_TABLES = ("cita", "empleado")
+
+
+class SlotUnavailableError(ValueError):
+    pass
+
+
+def to_minutes(value):
+    if isinstance(value, str):
+        value = datetime.time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    return datetime.time(minutes // 60, minutes % 60)
+
+
+def round_up(minutes, step):
+    return -(-minutes // step) * step
+
+
+class DaySchedule:
+    # Booked intervals of one employee on one day, in minutes since
+    # midnight. Active appointments never overlap (the database enforces
+    # it), so sorting by start also sorts the ends.
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start, end):
+        # Idempotent: a day reloaded by another thread between a booking's
+        # commit and this call already contains it.
+        index = bisect.bisect_left(self.starts, start)
+        if index < len(self.starts) and self.starts[index] == start and self.ends[index] == end:
+            return
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+
+    def remove(self, start, end):
+        index = bisect.bisect_left(self.starts, start)
+        if index < len(self.starts) and self.starts[index] == start and self.ends[index] == end:
+            del self.starts[index]
+            del self.ends[index]
+
+    def free_slots(self, duration, opening, closing, step, not_before=0):
+        start = max(opening, round_up(not_before, step))
+        while start + duration <= closing:
+            # First booking that ends after the candidate start.
+            index = bisect.bisect_right(self.ends, start)
+            if index < len(self.starts) and self.starts[index] < start + duration:
+                start = max(start + step, round_up(self.ends[index], step))
+                continue
+            yield start
+            start += step
+
+
+class SchedulingService:
+    _lock = threading.RLock()
+    _days = {}
+    _employees = None
+    _versions = None
+    _checked_at = 0.0
+
+    @staticmethod
+    def _check_versions():
+        # Other workers may book too; a cheap version read at most once per
+        # interval drops whatever the index can no longer trust.
+        now = time.monotonic()
+        if now - SchedulingService._checked_at < config.SCHEDULE_VERSION_CHECK_INTERVAL:
+            return
+        versions = dict(zip(sorted(WATCHED_TABLES), Database.table_versions(WATCHED_TABLES)))
+        with SchedulingService._lock:
+            previous = SchedulingService._versions or {}
+            if previous.get("cita") != versions["cita"]:
+                SchedulingService._days.clear()
+            if previous.get("empleado") != versions["empleado"]:
+                SchedulingService._employees = None
+            SchedulingService._versions = versions
+            SchedulingService._checked_at = now
+
+    @staticmethod
+    def _record_own_write(session):
+        # Version bumps are deferred to commit; applying them now makes the
+        # counter final for this transaction. Our own write bumped it by
+        # exactly one unless another writer slipped in, and only then does
+        # the whole index need reloading.
+        session.execute_query("SET CONSTRAINTS version_pendiente_aplicar IMMEDIATE", fetch=False)
+        rows = session.select("version_tabla", "version", "tabla = %s", ("cita",), row_format="tuple")
+        version = rows[0][0] if rows else 0
+        with SchedulingService._lock:
+            versions = SchedulingService._versions
+            if versions is None or versions.get("cita") != version - 1:
+                SchedulingService._days.clear()
+                SchedulingService._checked_at = 0.0
+            else:
+                versions["cita"] = version
+
+    @staticmethod
+    def employees():
+        SchedulingService._check_versions()
+        if SchedulingService._employees is None:
+            rows = Database.select("Empleado", "Usuario_idUsuario", order_by="Usuario_idUsuario", row_format="tuple")
+            SchedulingService._employees = tuple(row[0] for row in rows or [])
+        return SchedulingService._employees
+
+    @staticmethod
+    def service_duration(service_id):
+        service = CatalogService.service(service_id)
+        if service is None:
+            raise ValueError("Servicio no encontrado")
+        return service['duracion_minutos']
+
+    @staticmethod
+    def _load(employee_ids, start_date, end_date):
+        # Returns the schedules for every (employee, day) in the range,
+        # loading whatever is missing with a single query.
+        keys = [
+            (employee_id, start_date + datetime.timedelta(days=offset))
+            for employee_id in employee_ids
+            for offset in range((end_date - start_date).days + 1)
+        ]
+        with SchedulingService._lock:
+            days = {key: SchedulingService._days.get(key) for key in keys}
+            # Re-inserting marks the days as recently used.
+            for key, schedule in days.items():
+                if schedule is not None:
+                    SchedulingService._days[key] = SchedulingService._days.pop(key)
+        missing = sorted({employee_id for (employee_id, _), schedule in days.items() if schedule is None})
+        if not missing:
+            return days
+
+        rows = Database.select(
+            "cita",
+            "id_empleado, fecha, hora_inicio, hora_final",
+            "id_empleado = ANY(%s) AND fecha BETWEEN %s AND %s AND NOT is_canceled",
+            (missing, start_date, end_date),
+            row_format="tuple"
+        ) or []
+
+        loaded = {key: DaySchedule() for key in keys if key[0] in missing}
+        for employee_id, date, start, end in rows:
+            loaded[(employee_id, date)].add(to_minutes(start), to_minutes(end))
+
+        with SchedulingService._lock:
+            for key, schedule in loaded.items():
+                days[key] = SchedulingService._days.setdefault(key, schedule)
+            SchedulingService._evict(datetime.date.today())
+        return days
+
+    @staticmethod
+    def _evict(today):
+        # Called with the lock held. Past days are never asked for again;
+        # beyond that the least recently used days go first.
+        cached = SchedulingService._days
+        for key in [key for key in cached if key[1] < today]:
+            del cached[key]
+        while len(cached) > config.SCHEDULE_CACHE_MAX_DAYS:
+            del cached[next(iter(cached))]
+
+    @staticmethod
+    def _tagged(starts, employee_id):
+        for start in starts:
+            yield start, employee_id
+
+    @staticmethod
+    def free_slots(service_id, employee_id=None, start_date=None, count=10, now=None):
+        SchedulingService._check_versions()
+        duration = SchedulingService.service_duration(service_id)
+        if employee_id is not None:
+            if employee_id not in SchedulingService.employees():
+                raise ValueError("Empleado no encontrado")
+            employee_ids = (employee_id,)
+        else:
+            employee_ids = SchedulingService.employees()
+        if not employee_ids:
+            return []
+
+        now = now or datetime.datetime.now()
+        start_date = max(start_date or now.date(), now.date())
+        end_date = start_date + datetime.timedelta(days=config.APPOINTMENT_SEARCH_DAYS - 1)
+        days = SchedulingService._load(employee_ids, start_date, end_date)
+
+        opening = to_minutes(config.CLINIC_OPENING_TIME)
+        closing = to_minutes(config.CLINIC_CLOSING_TIME)
+        step = config.APPOINTMENT_SLOT_STEP
+
+        slots = []
+        date = start_date
+        with SchedulingService._lock:
+            while date <= end_date and len(slots) < count:
+                not_before = now.hour * 60 + now.minute if date == now.date() else 0
+                day_slots = heapq.merge(*(
+                    SchedulingService._tagged(
+                        days[(employee, date)].free_slots(duration, opening, closing, step, not_before), employee
+                    )
+                    for employee in employee_ids
+                ))
+                for start, employee in day_slots:
+                    slots.append({
+                        "fecha": date,
+                        "hora_inicio": to_time(start),
+                        "hora_final": to_time(start + duration),
+                        "id_empleado": employee
+                    })
+                    if len(slots) >= count:
+                        break
+                date += datetime.timedelta(days=1)
+        return slots
+
+    @staticmethod
+    def book(pet_id, service_id, employee_id, date, start_time, owner_id=None):
+        SchedulingService._check_versions()
+        duration = SchedulingService.service_duration(service_id)
+        start = to_minutes(start_time)
+        end = start + duration
+
+        if start < to_minutes(config.CLINIC_OPENING_TIME) or end > to_minutes(config.CLINIC_CLOSING_TIME):
+            raise ValueError("La cita debe estar dentro del horario de la clínica")
+        if datetime.datetime.combine(date, to_time(start)) < datetime.datetime.now():
+            raise ValueError("No se pueden reservar citas en el pasado")
+
+        condition = "e.Usuario_idUsuario = %s AND m.id_mascota = %s"
+        params = [employee_id, pet_id]
+        if owner_id is not None:
+            condition += " AND m.id_usuario = %s"
+            params.append(owner_id)
+
+        appointment = {
+            'fecha': date,
+            'hora_inicio': to_time(start),
+            'hora_final': to_time(end),
+            'is_canceled': False,
+            'id_servicio': service_id,
+            'id_mascota': pet_id,
+            'id_empleado': employee_id
+        }
+
+        try:
+            with Database.transaction() as session:
+                result = session.insert_select(
+                    "cita", appointment, "Empleado e, mascota m", condition, params, returning="id_cita"
+                )
+                if not result:
+                    raise ValueError("Empleado o mascota no encontrados")
+                SchedulingService._record_own_write(session)
+        except psycopg2.errors.ExclusionViolation:
+            with SchedulingService._lock:
+                SchedulingService._days.pop((employee_id, date), None)
+            raise SlotUnavailableError("El empleado ya tiene una cita en ese horario")
+
+        with SchedulingService._lock:
+            schedule = SchedulingService._days.get((employee_id, date))
+            if schedule is not None:
+                schedule.add(start, end)
+
+        row = result[0]
+        return row['id_cita'] if isinstance(row, dict) else row[0]
+
+    @staticmethod
+    def cancel(appointment_id, owner_id=None):
+        condition = "id_cita = %s AND NOT is_canceled"
+        params = [appointment_id]
+        if owner_id is not None:
+            condition += " AND id_mascota IN (SELECT id_mascota FROM mascota WHERE id_usuario = %s)"
+            params.append(owner_id)
+
+        with Database.transaction() as session:
+            result = session.update(
+                "cita", {'is_canceled': True}, condition, params,
+                returning="id_empleado, fecha, hora_inicio, hora_final"
+            )
+            if not result:
+                return False
+            SchedulingService._record_own_write(session)
+
+        appointment = result[0]
+        with SchedulingService._lock:
+            schedule = SchedulingService._days.get((appointment['id_empleado'], appointment['fecha']))
+            if schedule is not None:
+                schedule.remove(to_minutes(appointment['hora_inicio']), to_minutes(appointment['hora_final']))
+        return True
+
+    @staticmethod
+    def stats():
+        with SchedulingService._lock:
+            return {
+                'days': len(SchedulingService._days),
+                'intervals': sum(len(day.starts) for day in SchedulingService._days.values()),
+                'employees': len(SchedulingService._employees or ()),
+                'versions': dict(SchedulingService._versions or {}),
+            }
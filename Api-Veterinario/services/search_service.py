@@ -0,0 +1,66 @@
+import config
+from models.pet import Pet
+from models.user import User
+from utils.cache import LRUCache
+
+
+class SearchService:
+    _prefixes = LRUCache(config.AUTOCOMPLETE_CACHE_SIZE, config.AUTOCOMPLETE_CACHE_TTL)
+
+    @staticmethod
+    def normalize(text, min_length):
+        term = " ".join((text or "").split()).lower()
+        if len(term) < min_length:
+            raise ValueError(f"La búsqueda debe tener al menos {min_length} caracteres")
+        if len(term) > config.SEARCH_MAX_LENGTH:
+            raise ValueError(f"La búsqueda no puede superar {config.SEARCH_MAX_LENGTH} caracteres")
+        return term
+
+    @staticmethod
+    def search_users(text, limit):
+        term = SearchService.normalize(text, config.SEARCH_MIN_LENGTH)
+        return User.search(term, max(1, min(limit, config.SEARCH_LIMIT_MAX)))
+
+    @staticmethod
+    def search_pets(text, limit, owner_id=None):
+        term = SearchService.normalize(text, config.SEARCH_MIN_LENGTH)
+        return Pet.search(term, max(1, min(limit, config.SEARCH_LIMIT_MAX)), owner_id)
+
+    @staticmethod
+    def _autocomplete(scope, text, limit, load):
+        prefix = SearchService.normalize(text, config.AUTOCOMPLETE_MIN_LENGTH)
+        limit = max(1, min(limit, config.AUTOCOMPLETE_LIMIT_MAX))
+
+        # Every keystroke extends the previous prefix. If that shorter prefix
+        # returned fewer rows than the fetch size its result is complete, so
+        # the new one is a filter over it and needs no query at all.
+        for length in range(len(prefix), config.AUTOCOMPLETE_MIN_LENGTH - 1, -1):
+            entry = SearchService._prefixes.get((scope, prefix[:length]))
+            if entry is None:
+                continue
+            rows, complete = entry
+            if length < len(prefix):
+                if not complete:
+                    break
+                rows = [row for row in rows if row['nombre'].lower().startswith(prefix)]
+                SearchService._prefixes.set((scope, prefix), (rows, True))
+            return rows[:limit]
+
+        rows = load(prefix, config.AUTOCOMPLETE_LIMIT_MAX)
+        SearchService._prefixes.set((scope, prefix), (rows, len(rows) < config.AUTOCOMPLETE_LIMIT_MAX))
+        return rows[:limit]
+
+    @staticmethod
+    def autocomplete_users(text, limit):
+        return SearchService._autocomplete("usuarios", text, limit, User.autocomplete)
+
+    @staticmethod
+    def autocomplete_pets(text, limit, owner_id=None):
+        return SearchService._autocomplete(
+            f"mascotas:{owner_id}", text, limit,
+            lambda prefix, fetch: Pet.autocomplete(prefix, fetch, owner_id)
+        )
+
+    @staticmethod
+    def stats():
+        return SearchService._prefixes.stats()
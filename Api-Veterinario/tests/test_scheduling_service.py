@@ -0,0 +1,168 @@
+import datetime
+
+import pytest
+
+import config
+from db.database import Database
+from services.catalog_service import CatalogService
+from services.scheduling_service import DaySchedule, SchedulingService, to_minutes
+
+OPENING = to_minutes("09:00")
+CLOSING = to_minutes("12:00")
+DAY = datetime.date(2030, 1, 7)
+NOW = datetime.datetime(2030, 1, 7, 8, 0)
+
+
+def minutes(*values):
+    return [to_minutes(value) for value in values]
+
+
+class FakeDatabase:
+    # Stands in for Database.select / table_versions: appointments are
+    # (id_empleado, fecha, hora_inicio, hora_final) tuples.
+
+    def __init__(self, appointments=(), employees=(1, 2)):
+        self.appointments = list(appointments)
+        self.employees = employees
+        self.versions = {"cita": 1, "empleado": 1}
+        self.selects = []
+
+    def select(self, table, columns="*", condition=None, condition_params=None, **kwargs):
+        self.selects.append(table)
+        if table == "Empleado":
+            return [(employee,) for employee in self.employees]
+        employee_ids, start_date, end_date = condition_params
+        return [
+            row for row in self.appointments
+            if row[0] in employee_ids and start_date <= row[1] <= end_date
+        ]
+
+    def table_versions(self, tables):
+        return tuple(self.versions[name.lower()] for name in sorted(tables))
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDatabase()
+    monkeypatch.setattr(Database, "select", staticmethod(fake.select))
+    monkeypatch.setattr(Database, "table_versions", staticmethod(fake.table_versions))
+    monkeypatch.setattr(CatalogService, "service", staticmethod(lambda service_id: {"duracion_minutos": 30}))
+    monkeypatch.setattr(config, "CLINIC_OPENING_TIME", "09:00")
+    monkeypatch.setattr(config, "CLINIC_CLOSING_TIME", "12:00")
+    monkeypatch.setattr(config, "APPOINTMENT_SLOT_STEP", 15)
+    monkeypatch.setattr(config, "APPOINTMENT_SEARCH_DAYS", 2)
+    monkeypatch.setattr(config, "SCHEDULE_VERSION_CHECK_INTERVAL", 0)
+    monkeypatch.setattr(SchedulingService, "_days", {})
+    monkeypatch.setattr(SchedulingService, "_employees", None)
+    monkeypatch.setattr(SchedulingService, "_versions", None)
+    monkeypatch.setattr(SchedulingService, "_checked_at", 0.0)
+    return fake
+
+
+def test_day_schedule_keeps_intervals_sorted():
+    schedule = DaySchedule()
+    schedule.add(600, 630)
+    schedule.add(540, 570)
+    schedule.add(570, 600)
+    assert schedule.starts == [540, 570, 600]
+    assert schedule.ends == [570, 600, 630]
+
+
+def test_day_schedule_add_is_idempotent():
+    schedule = DaySchedule()
+    schedule.add(540, 570)
+    schedule.add(540, 570)
+    assert schedule.starts == [540]
+
+    schedule.remove(540, 570)
+    assert schedule.starts == [] and schedule.ends == []
+
+
+def test_day_schedule_remove_ignores_unknown_interval():
+    schedule = DaySchedule()
+    schedule.add(540, 570)
+    schedule.remove(540, 600)
+    assert schedule.starts == [540]
+
+
+def test_free_slots_on_empty_day():
+    slots = list(DaySchedule().free_slots(60, OPENING, CLOSING, 30))
+    assert slots == minutes("09:00", "09:30", "10:00", "10:30", "11:00")
+
+
+def test_free_slots_skip_bookings_and_realign_to_step():
+    schedule = DaySchedule()
+    schedule.add(*minutes("09:10", "09:50"))
+    schedule.add(*minutes("10:30", "11:00"))
+    slots = list(schedule.free_slots(30, OPENING, CLOSING, 15))
+    assert slots == minutes("10:00", "11:00", "11:15", "11:30")
+
+
+def test_free_slots_respect_not_before():
+    slots = list(DaySchedule().free_slots(30, OPENING, CLOSING, 15, not_before=to_minutes("10:05")))
+    assert slots[0] == to_minutes("10:15")
+
+
+def test_service_free_slots_merge_employees_in_time_order(fake_db):
+    fake_db.appointments = [(1, DAY, datetime.time(9, 0), datetime.time(9, 30))]
+    slots = SchedulingService.free_slots(1, count=3, now=NOW)
+    assert [(slot["hora_inicio"], slot["id_empleado"]) for slot in slots] == [
+        (datetime.time(9, 0), 2),
+        (datetime.time(9, 15), 2),
+        (datetime.time(9, 30), 1),
+    ]
+
+
+def test_service_free_slots_reuse_loaded_days(fake_db):
+    SchedulingService.free_slots(1, employee_id=1, count=2, now=NOW)
+    SchedulingService.free_slots(1, employee_id=1, count=2, now=NOW)
+    assert fake_db.selects.count("cita") == 1
+
+
+def test_service_free_slots_reload_after_foreign_write(fake_db):
+    SchedulingService.free_slots(1, employee_id=1, count=1, now=NOW)
+    fake_db.appointments = [(1, DAY, datetime.time(9, 0), datetime.time(12, 0))]
+    fake_db.versions["cita"] = 2
+
+    slots = SchedulingService.free_slots(1, employee_id=1, count=1, now=NOW)
+    assert slots[0]["fecha"] == DAY + datetime.timedelta(days=1)
+
+
+def test_service_free_slots_reject_unknown_employee(fake_db):
+    with pytest.raises(ValueError):
+        SchedulingService.free_slots(1, employee_id=99, count=1, now=NOW)
+
+
+def test_index_evicts_past_and_least_recently_used_days(fake_db, monkeypatch):
+    monkeypatch.setattr(config, "SCHEDULE_CACHE_MAX_DAYS", 3)
+    SchedulingService._days[(1, datetime.date(2000, 1, 3))] = DaySchedule()
+    SchedulingService.free_slots(1, employee_id=1, count=1, now=NOW)
+    SchedulingService.free_slots(1, employee_id=2, count=1, now=NOW)
+    assert len(SchedulingService._days) == 3
+    assert all(date >= DAY for _, date in SchedulingService._days)
+    assert (2, DAY + datetime.timedelta(days=1)) in SchedulingService._days
+
+
+class FakeSession:
+
+    def __init__(self, version):
+        self.version = version
+
+    def execute_query(self, *args, **kwargs):
+        return True
+
+    def select(self, *args, **kwargs):
+        return [(self.version,)]
+
+
+def test_record_own_write_keeps_index_when_version_is_next(fake_db):
+    SchedulingService.free_slots(1, employee_id=1, count=1, now=NOW)
+    SchedulingService._record_own_write(FakeSession(2))
+    assert SchedulingService._days
+    assert SchedulingService._versions["cita"] == 2
+
+
+def test_record_own_write_drops_index_after_concurrent_write(fake_db):
+    SchedulingService.free_slots(1, employee_id=1, count=1, now=NOW)
+    SchedulingService._record_own_write(FakeSession(3))
+    assert SchedulingService._days == {}
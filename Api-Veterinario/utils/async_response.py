@@ -0,0 +1,41 @@
+from quart import Response, current_app, jsonify
+
+from utils.response import APIResponse
+
+
+class AsyncAPIResponse:
+    @staticmethod
+    def success(data=None, message=None, status_code=200):
+        return jsonify(APIResponse.body(data, message)), status_code
+
+    @staticmethod
+    def stream(rows, output_format="ndjson", status_code=200):
+        dumps = current_app.json.dumps
+
+        async def generate_ndjson():
+            async for row in rows:
+                yield (dumps(row) + "\n").encode("utf-8")
+
+        async def generate_json():
+            yield b'{"data": ['
+            first = True
+            async for row in rows:
+                yield (dumps(row) if first else "," + dumps(row)).encode("utf-8")
+                first = False
+            yield b']}'
+
+        if output_format == "ndjson":
+            return Response(generate_ndjson(), status_code, mimetype="application/x-ndjson")
+        return Response(generate_json(), status_code, mimetype="application/json")
+
+    @staticmethod
+    def error(message, status_code=400):
+        return jsonify({"error": message}), status_code
+
+    @staticmethod
+    def missing_fields(fields):
+        return AsyncAPIResponse.error(f"Campos obligatorios faltantes: {', '.join(fields)}", 400)
+
+    @staticmethod
+    def unauthorized(message="No autorizado"):
+        return AsyncAPIResponse.error(message, 401)
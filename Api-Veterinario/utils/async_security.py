@@ -0,0 +1,41 @@
+from functools import wraps
+
+from quart import jsonify, request
+
+from utils.security import Security
+
+
+class AsyncSecurity:
+    @staticmethod
+    def token_required(f):
+
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            token = request.headers.get('Authorization')
+
+            if not token:
+                return jsonify({'mensaje': 'Token faltante!'}), 401
+
+            try:
+                data = Security.decode_token(token)
+                usuario_actual = data['usuario']
+            except:
+                return jsonify({'mensaje': 'Token inválido!'}), 401
+
+            return await f(usuario_actual, *args, **kwargs)
+
+        return decorated
+
+    @staticmethod
+    def role_required(*roles):
+
+        def decorator(f):
+            @wraps(f)
+            async def decorated_function(usuario_actual, *args, **kwargs):
+                if usuario_actual['rol'] not in roles:
+                    return jsonify({"error": f"Requiere permisos de {' o '.join(roles)}"}), 403
+                return await f(usuario_actual, *args, **kwargs)
+
+            return decorated_function
+
+        return decorator
@@ -0,0 +1,162 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        ttl = self.ttl if ttl is None else ttl
+        if expires_at is None and ttl is not None:
+            expires_at = time.time() + ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+            }
+
+
+class RedisCache:
+
+    def __init__(self, url, namespace, ttl=None):
+        if redis is None:
+            raise RuntimeError("El backend de caché 'redis' requiere el paquete redis")
+        self.namespace = namespace
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _failed(self, operation, error):
+        # An unreachable Redis degrades to no cache: reads miss and fall
+        # back to the database instead of failing the request.
+        with self._lock:
+            self._errors += 1
+        logger.warning("Caché redis no disponible (%s): %s", operation, error)
+
+    def get(self, key, default=None):
+        try:
+            raw = self._client.get(self._key(key))
+        except redis.RedisError as e:
+            self._failed("get", e)
+            raw = None
+        with self._lock:
+            if raw is None:
+                self._misses += 1
+                return default
+            self._hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl=None, expires_at=None):
+        ttl = self.ttl if ttl is None else ttl
+        if expires_at is not None:
+            ttl = max(expires_at - time.time(), 0)
+            if not ttl:
+                return
+        raw = json.dumps(value, default=str)
+        try:
+            if ttl is not None:
+                self._client.set(self._key(key), raw, px=max(int(ttl * 1000), 1))
+            else:
+                self._client.set(self._key(key), raw)
+        except redis.RedisError as e:
+            self._failed("set", e)
+
+    def delete(self, key):
+        try:
+            self._client.delete(self._key(key))
+        except redis.RedisError as e:
+            self._failed("delete", e)
+
+    def clear(self):
+        try:
+            for key in self._client.scan_iter(match=self._key("*")):
+                self._client.delete(key)
+        except redis.RedisError as e:
+            self._failed("clear", e)
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'redis',
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0.0,
+                'errors': self._errors,
+            }
+
+
+def create_cache(backend, namespace, max_size=1024, ttl=None, redis_url=None):
+    if backend == 'none':
+        return None
+    if backend == 'memory':
+        return LRUCache(max_size, ttl)
+    if backend == 'redis':
+        return RedisCache(redis_url, namespace, ttl)
+    raise ValueError(f"Backend de caché no válido: {backend}")
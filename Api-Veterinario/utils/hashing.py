@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+class HashingUnavailableError(RuntimeError):
+    pass
+
+
+class HashExecutor:
+
+    def __init__(self, workers=None, max_pending=None, timeout=10.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _get_executor(self):
+        # A forked worker cannot use the parent's process pool.
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._slots = threading.BoundedSemaphore(self.max_pending)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def run(self, function, *args):
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingUnavailableError("Demasiadas operaciones de contraseña en curso, inténtalo más tarde")
+
+        try:
+            future = executor.submit(function, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingUnavailableError("La operación de contraseña ha superado el tiempo máximo")
+
+    def map(self, function, items):
+        # Bulk work bypasses the pending-slot limit and is spread in chunks
+        # over all workers; its deadline scales with the batch size.
+        items = list(items)
+        if not items:
+            return []
+        executor = self._get_executor()
+        chunksize = max(1, len(items) // (self.workers * 4))
+        deadline = self.timeout * max(1, len(items) // self.workers)
+        try:
+            return list(executor.map(function, items, chunksize=chunksize, timeout=deadline))
+        except FutureTimeoutError:
+            raise HashingUnavailableError("La operación de contraseña ha superado el tiempo máximo")
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,41 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+import config
+from utils.serializers import _default, create_serializer, iter_encode, largest_list
+
+
+class APIJSONProvider(DefaultJSONProvider):
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.serializer = create_serializer(config.JSON_SERIALIZER)
+
+    @staticmethod
+    def default(o):
+        return _default(o)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", self.default)
+            kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+            kwargs.setdefault("sort_keys", self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return self.serializer.dumps(obj)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Pretty printing is a debugging aid; keep Flask's own path.
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        if config.JSON_STREAM_MIN_ITEMS and largest_list(obj) >= config.JSON_STREAM_MIN_ITEMS:
+            body = self._stream(obj)
+        else:
+            body = self.serializer.dumpb(obj) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+    def _stream(self, obj):
+        yield from iter_encode(self.serializer, obj, config.JSON_STREAM_CHUNK_SIZE)
+        yield b"\n"
@@ -1,8 +1,18 @@
-from flask import jsonify
+import hashlib
+import logging
+from functools import wraps
+
+import psycopg2
+from flask import Response, current_app, jsonify, make_response, request, stream_with_context
+import config
+from db.database import Database
+
+logger = logging.getLogger(__name__)
+
 
 class APIResponse:
     @staticmethod
-    def success(data=None, message=None, status_code=200):
+    def body(data=None, message=None):
         response = {}
         if message:
             response['mensaje'] = message
@@ -11,7 +21,75 @@ class APIResponse:
                 response.update(data)
             else:
                 response['data'] = data
-        return jsonify(response), status_code
+        return response
+
+    @staticmethod
+    def success(data=None, message=None, status_code=200):
+        return jsonify(APIResponse.body(data, message)), status_code
+
+    @staticmethod
+    def stream(rows, output_format="ndjson", status_code=200):
+        dumps = current_app.json.dumps
+
+        def generate_ndjson():
+            for row in rows:
+                yield dumps(row) + "\n"
+
+        def generate_json():
+            yield '{"data": ['
+            first = True
+            for row in rows:
+                yield dumps(row) if first else "," + dumps(row)
+                first = False
+            yield ']}'
+
+        if output_format == "ndjson":
+            return Response(stream_with_context(generate_ndjson()), status_code, mimetype="application/x-ndjson")
+        return Response(stream_with_context(generate_json()), status_code, mimetype="application/json")
+
+    @staticmethod
+    def conditional(*tables, per_user=True, versions=None, max_age=None):
+        # The ETag is derived from the version counters of the tables the
+        # endpoint reads, so an unchanged list costs one primary key lookup
+        # instead of the full query and its serialization.
+
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if not config.CONDITIONAL_GET_ENABLED or request.method != 'GET':
+                    return f(*args, **kwargs)
+
+                try:
+                    current = versions() if versions else Database.table_versions(tables)
+                except psycopg2.Error as e:
+                    logger.warning("No se pudo leer version_tabla, se omite el ETag: %s", e)
+                    return f(*args, **kwargs)
+                if current is None:
+                    return f(*args, **kwargs)
+
+                key = f"{request.full_path}|{current}"
+                if per_user:
+                    usuario_actual = args[0]
+                    key += f"|{usuario_actual['id']}|{usuario_actual['rol']}"
+                etag = hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+                if request.if_none_match.contains_weak(etag):
+                    response = Response(status=304)
+                else:
+                    response = make_response(f(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+
+                response.set_etag(etag, weak=True)
+                if max_age is not None:
+                    response.headers['Cache-Control'] = f"{'private' if per_user else 'public'}, max-age={max_age}"
+                else:
+                    response.headers['Cache-Control'] = "private, no-cache" if per_user else "no-cache"
+                return response
+
+            return decorated_function
+
+        return decorator
 
     @staticmethod
     def error(message, status_code=400):
@@ -1,25 +1,73 @@
 from werkzeug.security import check_password_hash, generate_password_hash
 import jwt
 import datetime
-from functools import wraps
+import hashlib
+import time
+from functools import lru_cache, partial, wraps
 from flask import request, jsonify
 import config
+from utils.cache import LRUCache
+from utils.hashing import HashExecutor
+from utils import metrics
+
+
+@lru_cache(maxsize=4)
+def _hash_prefix(method):
+    # Werkzeug expands short methods ("scrypt", "pbkdf2") with its defaults,
+    # so the canonical prefix is taken from a real hash.
+    return generate_password_hash("", method, 1).split("$", 1)[0]
 
 
 class Security:
+    _hash_executor = None
+    _token_cache = LRUCache(config.TOKEN_CACHE_SIZE)
+
+    @staticmethod
+    def get_hash_executor():
+        if Security._hash_executor is None:
+            Security._hash_executor = HashExecutor(
+                workers=config.HASH_EXECUTOR_WORKERS,
+                max_pending=config.HASH_EXECUTOR_MAX_PENDING,
+                timeout=config.HASH_EXECUTOR_TIMEOUT
+            )
+        return Security._hash_executor
+
     @staticmethod
     def hash_password(password):
-        return generate_password_hash(password)
+        args = (password, config.PASSWORD_HASH_METHOD, config.PASSWORD_SALT_LENGTH)
+        if config.HASH_EXECUTOR_ENABLED:
+            return Security.get_hash_executor().run(generate_password_hash, *args)
+        return generate_password_hash(*args)
+
+    @staticmethod
+    def hash_passwords(passwords):
+        hash_one = partial(
+            generate_password_hash,
+            method=config.PASSWORD_HASH_METHOD,
+            salt_length=config.PASSWORD_SALT_LENGTH
+        )
+        return Security.get_hash_executor().map(hash_one, passwords)
 
     @staticmethod
     def check_password(hashed_password, password):
-        return check_password_hash(hashed_password, password)
+        started = time.perf_counter()
+        try:
+            if config.HASH_EXECUTOR_ENABLED:
+                return Security.get_hash_executor().run(check_password_hash, hashed_password, password)
+            return check_password_hash(hashed_password, password)
+        finally:
+            if config.METRICS_ENABLED:
+                metrics.password_check_duration.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def needs_rehash(hashed_password):
+        return hashed_password.split("$", 1)[0] != _hash_prefix(config.PASSWORD_HASH_METHOD)
 
     @staticmethod
     def generate_token(user_data):
         token_payload = {
             'usuario': {
-                'id': user_data['idUsuario'],
+                'id': user_data['idusuario'] if 'idusuario' in user_data else user_data['idUsuario'],
                 'nombre': user_data['nombre'],
                 'rol': user_data['rol']
             },
@@ -29,9 +77,34 @@ class Security:
 
     @staticmethod
     def decode_token(token):
-        if token.startswith('Bearer '):
-            token = token.split('Bearer ')[1]
-        return jwt.decode(token, config.SECRET_KEY, algorithms=["HS256"])
+        started = time.perf_counter()
+        cache = "disabled"
+        try:
+            if token.startswith('Bearer '):
+                token = token.split('Bearer ')[1]
+
+            if not config.TOKEN_CACHE_ENABLED:
+                return jwt.decode(token, config.SECRET_KEY, algorithms=["HS256"])
+
+            # Only tokens that passed verification are cached, and each entry
+            # expires at the token's own exp, so expiry is honored exactly.
+            key = hashlib.sha256(token.encode('utf-8')).digest()
+            payload = Security._token_cache.get(key)
+            cache = "hit"
+            if payload is None:
+                cache = "miss"
+                payload = jwt.decode(token, config.SECRET_KEY, algorithms=["HS256"])
+                Security._token_cache.set(key, payload, expires_at=payload.get('exp'))
+            return payload
+        finally:
+            if config.METRICS_ENABLED:
+                metrics.token_decode_duration.observe(time.perf_counter() - started, cache)
+
+    @staticmethod
+    def token_cache_stats():
+        stats = Security._token_cache.stats()
+        stats['enabled'] = config.TOKEN_CACHE_ENABLED
+        return stats
 
     @staticmethod
     def token_required(f):
@@ -54,13 +127,13 @@ class Security:
         return decorated
 
     @staticmethod
-    def role_required(role):
+    def role_required(*roles):
 
         def decorator(f):
             @wraps(f)
             def decorated_function(usuario_actual, *args, **kwargs):
-                if usuario_actual['rol'] != role:
-                    return jsonify({"error": f"Requiere permisos de {role}"}), 403
+                if usuario_actual['rol'] not in roles:
+                    return jsonify({"error": f"Requiere permisos de {' o '.join(roles)}"}), 403
                 return f(usuario_actual, *args, **kwargs)
 
             return decorated_function
@@ -0,0 +1,88 @@
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from db.rows import Row
+
+
+def _default(o):
+    if isinstance(o, Row):
+        return o._asdict()
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class StdlibSerializer:
+    name = "stdlib"
+
+    def dumps(self, obj):
+        # Same output as Flask's compact jsonify: sorted keys, ASCII only.
+        return json.dumps(obj, default=_default, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+
+    def dumpb(self, obj):
+        return self.dumps(obj).encode("utf-8")
+
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self):
+        self.options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return self.dumpb(obj).decode("utf-8")
+
+    def dumpb(self, obj):
+        return orjson.dumps(obj, default=_default, option=self.options)
+
+
+def create_serializer(backend="auto"):
+    if backend == "auto":
+        backend = "orjson" if orjson is not None else "stdlib"
+    if backend == "orjson":
+        if orjson is None:
+            raise RuntimeError("El serializador orjson requiere el paquete orjson")
+        return OrjsonSerializer()
+    if backend == "stdlib":
+        return StdlibSerializer()
+    raise ValueError(f"Serializador JSON no válido: {backend}")
+
+
+def largest_list(obj):
+    if isinstance(obj, list):
+        return len(obj)
+    if isinstance(obj, dict):
+        return max((len(value) for value in obj.values() if isinstance(value, list)), default=0)
+    return 0
+
+
+def iter_encode(serializer, obj, chunk_size=500):
+    # Produces exactly the bytes of serializer.dumpb(obj), but encodes long
+    # lists chunk by chunk so the whole body never sits in memory at once.
+    if isinstance(obj, dict):
+        yield b"{"
+        for index, key in enumerate(sorted(obj, key=str)):
+            yield (b"," if index else b"") + serializer.dumpb(str(key)) + b":"
+            yield from iter_encode(serializer, obj[key], chunk_size)
+        yield b"}"
+    elif isinstance(obj, list) and len(obj) > chunk_size:
+        for start in range(0, len(obj), chunk_size):
+            chunk = serializer.dumpb(obj[start:start + chunk_size])
+            yield (b"[" if start == 0 else b",") + chunk[1:-1]
+        yield b"]"
+    else:
+        yield serializer.dumpb(obj)